@@ -6,11 +6,12 @@ Script to manage transfers of data backup tar files from GDEX Lustre storage to
 import os
 from pathlib import Path
 import sys
-from rda_python_globus.lib import transfer_client
+from rda_python_globus.lib import transfer_client, bulk_get_tasks, queued_logging
 from rda_python_globus.lib.config import ENDPOINT_ALIASES, TACC_BASE_PATH
 from rda_python_common.PgDBI import pgget, pgadd, pgupdt
 from globus_sdk import TransferData, GlobusAPIError
 import logging
+import logging.handlers
 
 my_logger = logging.getLogger(__name__)
 
@@ -82,6 +83,7 @@ def check_tar_files():
     tar_files = list(Path(TACC_LUSTRE_BASE_PATH).glob("*fn*.tar"))
 
     # Check if tar files have an entry in the 'tacc_backups' table with a Globus task ID
+    tar_records = {}
     for tar_file in tar_files:
         my_logger.info(f"Checking for task associated with {tar_file}...")
         file = os.path.basename(str(tar_file))
@@ -92,31 +94,45 @@ def check_tar_files():
         )
         if tar_record and tar_record["task_id"]:
             my_logger.info(f"Found record for {file}: {tar_record}")
-            
-            # Check status of associated Globus task and update record if status has changed
-            task_id = tar_record["task_id"]
-            try:
-                task_info = get_task(task_id, namespace="tacc")
-                if task_info['status'] != tar_record["status"]:
-                    record = {
-                        "status": task_info['status']                
-                        }
-                    if task_info['status'] not in ["ACTIVE", "INACTIVE"]:
-                        record["completion_time"] = task_info['completion_time']
-                    pgupdt(
-                        "tacc_backups",
-                        record,
-                        f"file='{file}'"
-                    )
-                    my_logger.info(f"Updated status for {file} to {task_info['status']}.")
-                else:
-                    my_logger.info(f"Status for {file} is still {task_info['status']}. No update needed.")
-            except GlobusAPIError:
-                msg = f"Failed to get task info for {file} with task ID {task_id}."
-                my_logger.warning(msg)
+            tar_records[file] = tar_record
         else:
             my_logger.info(f"No record found for {file}.")
-    
+
+    if not tar_records:
+        return
+
+    # Look up the status of all associated Globus tasks with a few grouped
+    # task_list queries, then update records whose status has changed
+    try:
+        tasks = bulk_get_tasks(
+            transfer_client(namespace="tacc"),
+            [tar_record["task_id"] for tar_record in tar_records.values()],
+        )
+    except GlobusAPIError as e:
+        my_logger.warning(f"Failed to get task info for {len(tar_records)} tar files: {e}")
+        return
+
+    for file, tar_record in tar_records.items():
+        task_id = str(tar_record["task_id"])
+        task_info = tasks.get(task_id)
+        if task_info is None:
+            my_logger.warning(f"Failed to get task info for {file} with task ID {task_id}.")
+            continue
+        if task_info['status'] != tar_record["status"]:
+            record = {
+                "status": task_info['status']
+                }
+            if task_info['status'] not in ["ACTIVE", "INACTIVE"]:
+                record["completion_time"] = task_info['completion_time']
+            pgupdt(
+                "tacc_backups",
+                record,
+                f"file='{file}'"
+            )
+            my_logger.info(f"Updated status for {file} to {task_info['status']}.")
+        else:
+            my_logger.info(f"Status for {file} is still {task_info['status']}. No update needed.")
+
     return
 
 def move_completed_files():
@@ -222,35 +238,37 @@ def submit_new_transfers():
     return
 
 def configure_log(**kwargs):
-    """ Set up logging configuration """
-
-    if 'loglevel' in kwargs:
-        loglevel = kwargs['loglevel']
-    else:
-        loglevel = 'info'
+    """
+    Set up logging configuration.  The rotating log file on Lustre is written
+    by a background thread, so slow metadata servers do not hold up task
+    submission.  Like dsglobus, the script reads DSGLOBUS_LOG_FILE (default
+    LOGPATH; an empty value disables the file), DSGLOBUS_LOG_LEVEL,
+    DSGLOBUS_LOG_QUEUE_SIZE and DSGLOBUS_LOG_OVERFLOW.  A 'loglevel' keyword
+    argument overrides DSGLOBUS_LOG_LEVEL.
+    """
 
-    level = getattr(logging, loglevel.upper())
-    my_logger.setLevel(level)
+    logfile = os.environ.get("DSGLOBUS_LOG_FILE", LOGPATH)
 
     formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 
     """ Rotating file handler """
-    rfh = logging.handlers.RotatingFileHandler(LOGPATH,maxBytes=200000000,backupCount=10)
-    rfh.setLevel(level)
-    rfh.setFormatter(formatter)
-    my_logger.addHandler(rfh)
+    handlers = []
+    if logfile:
+        rfh = logging.handlers.RotatingFileHandler(logfile,maxBytes=200000000,backupCount=10,delay=True)
+        rfh.setFormatter(formatter)
+        handlers.append(rfh)
 
     """ stdout handler """
     stdout_handler = logging.StreamHandler(sys.stdout)
-    stdout_handler.setLevel(level)
     stdout_handler.setFormatter(formatter)
-    my_logger.addHandler(stdout_handler)
-		
+
+    queued_logging(handlers, logger=my_logger, level=kwargs.get('loglevel'), direct_handlers=[stdout_handler])
+
     return
 
 #----------------------------------------------------------------------------------------
 
-configure_log(loglevel='info')
+configure_log()
 
 # First check status of existing tasks and update records in the database before 
 # submitting new transfer tasks. This ensures that we have the most up-to-date 
@@ -1,4 +1,8 @@
 import sys
+import json
+import time
+import itertools
+import posixpath
 import click
 import textwrap
 import typing as t
@@ -11,20 +15,233 @@ from .lib import (
     endpoint_options,
     namespace_options,
     transfer_client,
-    process_json_stream,
+    iter_manifest,
+    map_unordered,
+    RateLimiter,
+    walk_tree,
+    human_size,
+    chunk_label,
+    submit_chunks,
 )
 
 import logging
 logger = logging.getLogger(__name__)
 
 def add_batch_to_delete_data(batch, delete_data):
-    """ Add batch of files to delete data object. """
-    delete_files = process_json_stream(batch)
-    for file in delete_files:
-        delete_data.add_item(file)
+    """ Add batch of files to delete data object, reading the manifest incrementally. """
+    for entry in iter_manifest(batch, ("path",)):
+        delete_data.add_item(entry["path"])
 
     return delete_data
 
+def iter_delete_paths(batch):
+    """ Yield the paths of a delete batch manifest, reading it incrementally. """
+    for entry in iter_manifest(batch, ("path",)):
+        yield entry["path"]
+
+def chunk_paths(paths, max_items):
+    """ Group paths into lists of at most max_items paths. """
+    paths = iter(paths)
+    while True:
+        chunk = list(itertools.islice(paths, max_items))
+        if not chunk:
+            return
+        yield chunk
+
+def new_delete_data(endpoint, label, recursive, paths=()):
+    """
+    Create a DeleteData object holding the given paths.  No client is
+    attached, so the submission ID is only requested when the task is
+    submitted.
+    """
+    delete_data = DeleteData(endpoint=endpoint, label=label, recursive=recursive)
+    for path in paths:
+        delete_data.add_item(path)
+    return delete_data
+
+def echo_delete_data(data):
+    """ Print the contents of a delete submission as a sanity check. """
+    click.echo("Dry run: delete data to be submitted:")
+    click.echo(f"Endpoint: {data['endpoint']}")
+    try:
+        click.echo(f"Label: {data['label']}")
+    except KeyError:
+        click.echo("Label: None")
+    click.echo("Files to delete:")
+    for item in data["DATA"]:
+        click.echo(f"  {item}")
+    click.echo("\n")
+
+def write_failed_paths(delete_data, failed_batch):
+    """ Append the paths of a delete chunk that failed to submit to an NDJSON batch file. """
+    for item in delete_data["DATA"]:
+        failed_batch.write(json.dumps({"path": item["path"]}) + "\n")
+    failed_batch.flush()
+
+def estimate_delete(tc, endpoint, paths, recursive=False, workers=8):
+    """
+    Count the files, directories and bytes a delete of ``paths`` would
+    remove.  The parent directory of every target is listed once, in
+    parallel, to find out whether the target is a file or a directory;
+    with recursive, directory targets are then walked with walk_tree.
+    Returns a dict of totals, including lists of the targets not found and
+    of directory targets that could not be deleted without --recursive.
+    """
+    paths = list(dict.fromkeys(path.rstrip("/") or "/" for path in paths))
+    parents = sorted({posixpath.dirname(path) for path in paths})
+
+    def list_parent(parent):
+        return {entry["name"]: entry for entry in tc.operation_ls(endpoint, path=parent)}
+
+    listings = {}
+    for parent, entries, error in map_unordered(list_parent, parents, workers):
+        if error is None:
+            listings[parent] = entries
+        elif isinstance(error, GlobusAPIError) and error.http_status == 404:
+            listings[parent] = {}
+        else:
+            raise error
+
+    totals = {"targets": len(paths), "files": 0, "directories": 0, "bytes": 0, "missing": [], "not_recursive": []}
+    for path in paths:
+        entry = listings[posixpath.dirname(path)].get(posixpath.basename(path))
+        if entry is None:
+            totals["missing"].append(path)
+        elif entry["type"] != "dir":
+            totals["files"] += 1
+            totals["bytes"] += entry["size"] or 0
+        elif not recursive:
+            totals["not_recursive"].append(path)
+        else:
+            for _, _, entries in walk_tree(tc, endpoint, path=posixpath.join(path, ""), workers=workers):
+                totals["directories"] += 1
+                for item in entries:
+                    if item["type"] != "dir":
+                        totals["files"] += 1
+                        totals["bytes"] += item["size"] or 0
+    return totals
+
+def echo_delete_estimate(endpoint, totals):
+    click.echo(f"Dry run estimate for delete on endpoint {endpoint}:")
+    click.echo(f"  Targets:      {totals['targets']} ({len(totals['missing'])} not found)")
+    click.echo(f"  Files:        {totals['files']}")
+    click.echo(f"  Directories:  {totals['directories']}")
+    click.echo(f"  Bytes:        {totals['bytes']} ({human_size(totals['bytes'])})")
+    for path in totals["missing"][:10]:
+        click.echo(f"  Not found: {path}")
+    if len(totals["missing"]) > 10:
+        click.echo(f"  ... and {len(totals['missing']) - 10} more not found")
+    if totals["not_recursive"]:
+        click.echo(f"  {len(totals['not_recursive'])} targets are directories and require --recursive, e.g. {totals['not_recursive'][0]}")
+
+def _is_exists_error(error):
+    """ True for the error returned when mkdir finds the directory already there. """
+    return isinstance(error, GlobusAPIError) and "Exists" in (error.code or "")
+
+def directory_levels(paths, parents=False):
+    """
+    Group directory paths by depth, shallowest first, after normalizing
+    and removing duplicates.  With parents, every ancestor of every path
+    (below the endpoint root) is included as well.
+    """
+    levels = {}
+    for path in paths:
+        path = posixpath.normpath(path)
+        while path not in ("/", "~", ".", ""):
+            depth = path.count("/")
+            if path in levels.setdefault(depth, set()):
+                break
+            levels[depth].add(path)
+            if not parents:
+                break
+            path = posixpath.dirname(path)
+    return [sorted(levels[depth]) for depth in sorted(levels)]
+
+def make_directories(tc, endpoint, paths, parents=False, workers=8, existing=None):
+    """
+    Create directories on an endpoint one depth level at a time, with up
+    to ``workers`` operation_mkdir calls in flight per level.  A directory
+    that turns out to exist already is added to the ``existing`` set, which
+    is also consulted first, so no path is requested twice.  Directories
+    below one that could not be created are skipped.  Returns a dict of
+    'created', 'existing', 'failed' and 'skipped' counts.
+    """
+    existing = set() if existing is None else existing
+    failed = set()
+    counts = {"created": 0, "existing": 0, "failed": 0, "skipped": 0}
+
+    def mkdir(path):
+        return tc.operation_mkdir(endpoint, path=path)
+
+    for level in directory_levels(paths, parents):
+        todo = []
+        for path in level:
+            if path in existing:
+                counts["existing"] += 1
+            elif _ancestors(path) & failed:
+                counts["skipped"] += 1
+                failed.add(path)
+            else:
+                todo.append(path)
+        for path, _, error in map_unordered(mkdir, todo, workers):
+            if error is None:
+                counts["created"] += 1
+                existing.add(path)
+                logger.info(f"[make_directories] Created {path}")
+            elif _is_exists_error(error):
+                counts["existing"] += 1
+                existing.add(path)
+            elif isinstance(error, (GlobusAPIError, NetworkError)):
+                counts["failed"] += 1
+                failed.add(path)
+                logger.error(f"Error creating directory {path}: {error}")
+            else:
+                raise error
+    return counts
+
+def _ancestors(path):
+    ancestors = set()
+    while True:
+        parent = posixpath.dirname(path)
+        if parent == path or not parent:
+            return ancestors
+        ancestors.add(parent)
+        path = parent
+
+def load_renamed_pairs(path):
+    """
+    Return the set of (old_path, new_path) pairs recorded as renamed in an
+    NDJSON results file written by 'rename --results'.  Unparseable lines,
+    such as one cut short by an interrupted run, are skipped.
+    """
+    renamed = set()
+    with open(path) as f:
+        for n, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                logger.warning(f"[load_renamed_pairs] Skipping unreadable line {n} of {path}")
+                continue
+            if record.get("status") == "ok":
+                renamed.add((record["old_path"], record["new_path"]))
+    return renamed
+
+def rename_result(file, res=None, error=None):
+    """ Result record for one rename, as written to the --results file. """
+    record = {"old_path": file["old_path"], "new_path": file["new_path"]}
+    if error is None:
+        record.update(status="ok", message=res["message"])
+    else:
+        record.update(
+            status="error",
+            code=getattr(error, "code", type(error).__name__),
+            message=getattr(error, "message", None) or str(error),
+        )
+    return record
+
 @click.command(
     "mkdir",
     short_help="Create a directory on a Globus endpoint.",
@@ -37,21 +254,85 @@ def add_batch_to_delete_data(batch, delete_data):
    $ dsglobus mkdir \\
        --endpoint gdex-quasar \\
        --path /d999009/new_directory
+\b
+2. Create a directory and any missing parent directories:
+\b
+   $ dsglobus mkdir \\
+       --endpoint gdex-quasar \\
+       --path /d999009/2024/01/01 \\
+       --parents
+\b
+3. Create every directory listed in a file (one path per line, or a JSON
+   array of paths), with their parents, 16 at a time:
+\b
+   $ dsglobus mkdir \\
+       --endpoint gdex-quasar \\
+       --batch dirs.txt \\
+       --parents \\
+       --workers 16
 '''
 )
+@click.option(
+    "--batch",
+	type=click.File('r'),
+    help=textwrap.dedent("""\
+        Create the directories listed in a file.  Use '-' to read from 
+        stdin.  The file may be a JSON array or plain text with one path 
+        per line.  --path is ignored if --batch is used.
+    """),
+)
+@click.option(
+    "--parents",
+    is_flag=True,
+    default=False,
+    help="Create missing parent directories as needed, and do not fail on directories that already exist.",
+)
+@click.option(
+    "--workers",
+    "-w",
+    type=click.IntRange(min=1),
+    default=8,
+    show_default=True,
+    help="Number of directories created concurrently at each depth level.",
+)
 @endpoint_options
 @path_options
 @namespace_options
 @common_options
 def mkdir_command(
     endpoint: str,
+    batch: t.Optional[t.TextIO],
+    parents: bool,
+    workers: int,
     path: str,
     namespace: str
 ) -> None:
     """
     Create a directory on a Globus endpoint. Directory path is relative to the endpoint host path.
+
+    \b
+    With --batch and/or --parents, the requested directories and (with
+    --parents) all of their ancestors are deduplicated and created one depth
+    level at a time, each level in parallel.  Directories that already
+    exist are remembered, so every path is requested at most once.
     """
     tc = transfer_client(namespace=namespace)
+    if batch or parents:
+        if batch:
+            paths = [entry["path"] for entry in iter_manifest(batch, ("path",))]
+        elif path:
+            paths = [path]
+        else:
+            raise click.UsageError('--path or --batch is required.')
+        counts = make_directories(tc, endpoint, paths, parents, workers)
+        click.echo(
+            f"Created {counts['created']} directories, {counts['existing']} already existed, "
+            f"{counts['failed']} failed, {counts['skipped']} skipped below a failed directory."
+        )
+        if counts["failed"] or (counts["existing"] and not parents):
+            sys.exit(1)
+        return
+
     try:
         res = tc.operation_mkdir(endpoint, path=path)
         click.echo(f"{res['message']}")
@@ -125,6 +406,19 @@ def mkdir_command(
        }
    ]
    <Ctrl+D>
+\b
+5. Rename 20000 files with 8 parallel workers at no more than 20 renames per
+second, recording every result and carrying on past errors.  Running the same
+command again retries only the entries not recorded as renamed:
+\b
+   $ dsglobus rename \\
+       --endpoint gdex-quasar \\
+       --batch /path/to/batch.json \\
+       --workers 8 \\
+       --rate 20 \\
+       --continue-on-error \\
+       --results renames.ndjson \\
+       --resume renames.ndjson
 '''
 )
 @click.option(
@@ -145,9 +439,53 @@ def mkdir_command(
     help=textwrap.dedent("""\
         Accept a batch of multiple file/directory name pairs from a file. 
         Use '-' to read from stdin, and close the stream with 'Ctrl+D'.  
+        The file may be JSON, NDJSON or plain text with two columns.  
         See examples below.
     """),
 )
+@click.option(
+    "--workers",
+    "-w",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help=textwrap.dedent("""\
+        Number of renames run concurrently.  Entries are then renamed in 
+        no particular order, so the batch must not depend on an earlier 
+        entry (e.g. renaming a directory and then files inside it).
+    """),
+)
+@click.option(
+    "--rate",
+    type=click.FloatRange(min=0.1),
+    default=None,
+    help="Maximum number of rename requests per second, shared by all workers.  Unlimited by default.",
+)
+@click.option(
+    "--continue-on-error",
+    is_flag=True,
+    default=False,
+    help="Keep going after a failed rename, and exit with status 1 at the end if any failed.",
+)
+@click.option(
+    "--results",
+    type=click.File('a'),
+    default=None,
+    help=textwrap.dedent("""\
+        Append one NDJSON record per entry to this file, with its old and 
+        new path, status ('ok' or 'error') and message.  Use '-' for stdout.
+    """),
+)
+@click.option(
+    "--resume",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help=textwrap.dedent("""\
+        Skip entries recorded as renamed in this --results file from an 
+        earlier run.  A missing file is treated as empty, so the same 
+        path can be given to --results and --resume.
+    """),
+)
 @endpoint_options
 @namespace_options
 @common_options
@@ -156,6 +494,11 @@ def rename_command(
     old_path: str,
     new_path: str,
     batch: t.TextIO,
+    workers: int,
+    rate: t.Optional[float],
+    continue_on_error: bool,
+    results: t.Optional[t.TextIO],
+    resume: t.Optional[str],
     namespace: str
 ) -> None:
     """
@@ -165,7 +508,7 @@ def rename_command(
         raise click.UsageError('--old-path and --new-path, or --batch is required.')
 
     if batch:
-        files = process_json_stream(batch)
+        files = iter_manifest(batch, ("old_path", "new_path"))
     else:
         if old_path is None or new_path is None:
             raise click.UsageError('--old-path and --new-path are required if --batch is not used.')
@@ -176,16 +519,61 @@ def rename_command(
             }
         ]
     
-    tc = transfer_client(namespace=namespace)
-    for file in files:
-        old_path = file["old_path"]
-        new_path = file["new_path"]
+    renamed = set()
+    if resume:
         try:
-            res = tc.operation_rename(endpoint, oldpath=old_path, newpath=new_path)
-            click.echo(f"old path: {old_path}\nnew path: {new_path}\n{res['message']}")
-        except (GlobusAPIError, NetworkError) as e:
-            logger.error(f"Error renaming file/directory: {e}")
-            raise click.Abort()
+            renamed = load_renamed_pairs(resume)
+        except FileNotFoundError:
+            pass
+    counts = {"ok": 0, "error": 0, "skipped": 0}
+    stopped = False
+
+    def todo():
+        for file in files:
+            if stopped:
+                return
+            if (file["old_path"], file["new_path"]) in renamed:
+                counts["skipped"] += 1
+                continue
+            yield file
+
+    tc = transfer_client(namespace=namespace)
+    limiter = RateLimiter(rate, burst=workers) if rate else None
+
+    def rename(file):
+        if limiter:
+            limiter.acquire()
+        return tc.operation_rename(endpoint, oldpath=file["old_path"], newpath=file["new_path"])
+
+    # with --results -, stdout carries only the NDJSON records
+    echo = results is None or getattr(results, "name", None) != "<stdout>"
+
+    # results are handled in this thread only, as the renames complete
+    for file, res, error in map_unordered(rename, todo(), workers):
+        if error is not None and not isinstance(error, (GlobusAPIError, NetworkError)):
+            raise error
+        record = rename_result(file, res, error)
+        counts[record["status"]] += 1
+        if results:
+            results.write(json.dumps(record) + "\n")
+            results.flush()
+        if error is None:
+            if echo:
+                click.echo(f"old path: {file['old_path']}\nnew path: {file['new_path']}\n{res['message']}")
+        else:
+            logger.error(f"Error renaming file/directory {file['old_path']}: {error}")
+            if not continue_on_error:
+                stopped = True
+
+    if batch:
+        click.echo(
+            f"Renamed {counts['ok']}, failed {counts['error']}, skipped {counts['skipped']} already renamed.",
+            err=True,
+        )
+    if counts["error"]:
+        if continue_on_error:
+            sys.exit(1)
+        raise click.Abort()
 
 @click.command(
     "delete",
@@ -240,6 +628,26 @@ def rename_command(
        "/d999009/dir2"
    ]
    <Ctrl+D>
+\b
+5. Preview how many files and bytes a recursive delete would remove, without
+   submitting anything:
+\b
+   $ dsglobus delete \\
+       --endpoint gdex-lustre \\
+       --batch /path/to/batch.json \\
+       --recursive \\
+       --dry-run \\
+       --estimate
+\b
+6. Split a large batch into delete tasks of at most 5000 paths each, labelled
+   'scratch cleanup part 1', 'scratch cleanup part 2', ..., submitting up to 4
+   at a time:
+\b
+   $ dsglobus delete \\
+       --endpoint gdex-lustre \\
+       --batch /path/to/batch.json \\
+       --label "scratch cleanup" \\
+       --max-items-per-task 5000
 '''
 )
 @click.option(
@@ -254,6 +662,7 @@ def rename_command(
     help=textwrap.dedent("""\
         Accept a batch of files/directories from a file. 
         Use '-' to read from stdin, and close the stream with 'Ctrl+D'.  
+        The file may be a JSON array or plain text with one path per line.  
         See examples below.
     """),
 )
@@ -265,6 +674,43 @@ def rename_command(
     show_default=True,
     help="Recursively delete directories and their contents.  Required if deleting a directory.",
 )
+@click.option(
+    "--estimate",
+    is_flag=True,
+    default=False,
+    help=textwrap.dedent("""\
+        With --dry-run, list the targets on the endpoint and report how 
+        many files, directories and bytes the delete would remove.  
+        Directories are walked in parallel with --recursive.
+    """),
+)
+@click.option(
+    "--workers",
+    "-w",
+    type=click.IntRange(min=1),
+    default=8,
+    show_default=True,
+    help="Number of concurrent directory listings used by --estimate.",
+)
+@click.option(
+    "--max-items-per-task",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Split a --batch manifest into several delete tasks of at most this many paths each.",
+)
+@click.option(
+    "--max-concurrent-submissions",
+    type=click.IntRange(min=1),
+    default=4,
+    show_default=True,
+    help="Maximum number of chunked delete tasks submitted concurrently.",
+)
+@click.option(
+    "--failed-batch",
+    type=click.File('w'),
+    default=None,
+    help="Write the paths of chunks that could not be submitted to this file, as an NDJSON batch for resubmission.",
+)
 @endpoint_options
 @task_submission_options
 @namespace_options
@@ -276,14 +722,59 @@ def delete_command(
     batch: t.TextIO,
     dry_run: bool,
     recursive: bool,
+    estimate: bool,
+    workers: int,
+    max_items_per_task: t.Optional[int],
+    max_concurrent_submissions: int,
+    failed_batch: t.Optional[t.TextIO],
     namespace: str,
 ) -> None:
     """
     Delete files and/or directories on a Globus endpoint. Directory
     path is relative to the endpoint host path.
     """
+    if estimate and not dry_run:
+        raise click.UsageError('--estimate requires --dry-run.')
+
     tc = transfer_client(namespace=namespace)
-    delete_data = DeleteData(tc, endpoint, label=label, recursive=recursive)
+
+    if estimate:
+        if batch:
+            paths = iter_delete_paths(batch)
+        elif target_file is None:
+            raise click.UsageError('--target-file is required if --batch is not used.')
+        else:
+            paths = [target_file]
+        try:
+            totals = estimate_delete(tc, endpoint, paths, recursive, workers)
+        except (GlobusAPIError, NetworkError) as e:
+            logger.error(f"Error listing delete targets: {e}")
+            raise click.Abort()
+        echo_delete_estimate(endpoint, totals)
+        return
+
+    if batch and max_items_per_task:
+        label = label or time.strftime("dsglobus delete %Y-%m-%d %H%M%S")
+        chunks = (
+            new_delete_data(endpoint, chunk_label(label, part), recursive, chunk)
+            for part, chunk in enumerate(chunk_paths(iter_delete_paths(batch), max_items_per_task), 1)
+        )
+        if dry_run:
+            for delete_data in chunks:
+                echo_delete_data(delete_data.data)
+            return
+        submit_chunks(
+            tc.submit_delete,
+            chunks,
+            label,
+            max_concurrent_submissions,
+            max_concurrent_submissions,
+            on_failure=(lambda dd: write_failed_paths(dd, failed_batch)) if failed_batch else None,
+            kind="delete",
+        )
+        return
+
+    delete_data = new_delete_data(endpoint, label, recursive)
 
     # If a batch file is provided, read the file and add to delete data
     if batch:
@@ -304,20 +795,8 @@ def delete_command(
 
     # If dry run is specified, print the delete data and exit
     if dry_run:
-        click.echo("Dry run: delete data to be submitted:")
-        data = delete_data.data
-        click.echo(f"Endpoint: {data['endpoint']}")
-        try:
-            click.echo(f"Label: {data['label']}")
-        except KeyError:
-            click.echo("Label: None")
-        click.echo("Files to delete:")
-        for item in data["DATA"]:
-            click.echo(f"  {item}")
-        click.echo("\n")
-
-        # exit safely
-        sys.exit(1)
+        echo_delete_data(delete_data.data)
+        return
 
     # Submit the task
     try:
@@ -1,14 +1,58 @@
+import importlib
 import json
 import os
+import sys
+import itertools
 import logging
 import re
-import typing as t
-import six
 
 import click
 
-from .auth import token_storage_adapter, auth_client, transfer_client
-from .config import ENDPOINT_ALIASES, LOGPATH, LOGFILE, TACC_GLOBUS_ENDPOINT, TACC_BASE_PATH
+from .manifest import iter_manifest
+from .events import EventSummary
+from .logs import queued_logging
+from .output import OUTPUT_FORMATS, human_size, record_keys, write_json, write_ndjson, write_csv
+from .config import ENDPOINT_ALIASES, NAMESPACES, LOGPATH, LOGFILE, TACC_GLOBUS_ENDPOINT, TACC_BASE_PATH, DU_CACHE_FILE, \
+    LS_CACHE_FILE, LS_CACHE_TTL, LS_CACHE_MAX_BYTES
+
+# names from submodules that import globus_sdk, requests, sqlite3 or
+# concurrent.futures; they are imported on first use (see __getattr__) so
+# that loading the CLI for --help stays fast
+_LAZY_IMPORTS = {
+    "token_storage_adapter": "auth",
+    "auth_client": "auth",
+    "transfer_client": "auth",
+    "list_directory": "walk",
+    "walk_tree": "walk",
+    "SubtreeSizeCache": "cache",
+    "ListingCache": "cache",
+    "CachingTransferClient": "cache",
+    "prefetch": "concurrency",
+    "map_unordered": "concurrency",
+    "RateLimiter": "concurrency",
+    "iter_task_pages": "tasks",
+    "task_list_by_id": "tasks",
+    "bulk_get_tasks": "tasks",
+    "task_progress": "tasks",
+    "AdaptivePollInterval": "tasks",
+    "TERMINAL_STATUSES": "tasks",
+    "iter_successful_transfer_pages": "tasks",
+    "iter_task_event_pages": "tasks",
+    "ChunkSubmitter": "submit",
+    "chunk_label": "submit",
+    "submit_chunks": "submit",
+}
+
+def __getattr__(name):
+    module = _LAZY_IMPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+# rows buffered by print_table to size its columns before streaming the rest
+TABLE_SAMPLE_SIZE = 1000
 
 def common_options(f):
     # any shared/common options for all commands
@@ -58,8 +102,44 @@ def namespace_options(f):
     )(f)
     return f
 
+def validate_namespaces(ctx, param, value):
+    """ Split a comma-separated namespace list; 'all' selects every configured namespace. """
+    if value == "all":
+        return list(NAMESPACES)
+    namespaces = [ns.strip() for ns in value.split(",") if ns.strip()]
+    unknown = [ns for ns in namespaces if ns not in NAMESPACES]
+    if unknown or not namespaces:
+        raise click.BadParameter(f"Invalid namespace: {', '.join(unknown)}. Valid namespaces are: all, {', '.join(NAMESPACES)}")
+    return list(dict.fromkeys(namespaces))
+
+def multi_namespace_options(f):
+    f = click.option(
+        "--namespace",
+        "-ns",
+        "namespaces",
+        type=str,
+        default="DEFAULT",
+        show_default=True,
+        callback=validate_namespaces,
+        help="Globus client namespace(s) to query: one namespace, a comma-separated list (e.g. 'DEFAULT,tacc'), or 'all'. Multiple namespaces are queried concurrently and their results merged.",
+    )(f)
+    return f
+
+def format_options(f):
+    f = click.option(
+        "--format",
+        "-F",
+        "output_format",
+        type=click.Choice(OUTPUT_FORMATS),
+        default="table",
+        show_default=True,
+        envvar="DSGLOBUS_FORMAT",
+        help="Output format.  json, ndjson and csv are written record by record as results arrive.  May also be set with the DSGLOBUS_FORMAT environment variable.",
+    )(f)
+    return f
+
 def valid_uuid(uuid):
-    regex = re.compile('^[a-f0-9]{8}-?[a-f0-9]{4}-?[a-f0-9]{4}-?[a-f0-9]{4}-?[a-f0-9]{12}\Z', re.I)
+    regex = re.compile(r'^[a-f0-9]{8}-?[a-f0-9]{4}-?[a-f0-9]{4}-?[a-f0-9]{4}-?[a-f0-9]{12}\Z', re.I)
     match = regex.match(uuid)
     return bool(match)
 
@@ -74,6 +154,9 @@ def validate_dsid(ctx, param, dsid):
 def validate_endpoint(ctx, param, endpoint):
     """ Validate endpoint from command line input """
 
+    if endpoint is None:
+        return None
+
     if valid_uuid(endpoint):
         return endpoint
 
@@ -98,53 +181,19 @@ def colon_formatted_print(data, named_fields):
     click.echo("\n")
     return
 
-def process_json_stream(stream: t.TextIO) -> t.Dict[str, t.Any]:
-    """ Process a JSON stream from stdin and return a JSON object. """
-    
-    json_str = ""
-
-    # Read the stream line by line
-    for lineno, line in enumerate(stream.readlines()):
-        # Skip empty lines
-        if not line.strip():
-            continue
-        json_str += line
-    
-    # Remove trailing commas
-    json_str = remove_trailing_comma(json_str)
-    # Convert single quote keys/values to double quotes
-    json_str = json_str.replace("'", '"')
-
-    # Parse the JSON string into a Python object
-    try:
-        obj = json.loads(json_str)
-    except json.JSONDecodeError as e:
-        raise click.BadParameter(f"Invalid JSON format at line {lineno + 1}: {e}")
-    
-    return obj
-
-def remove_trailing_comma(json_string):
-    """ Removes trailing commas from a JSON string.
-
-    Args:
-      json_string: The JSON string to process.
-
-    Returns:
-      The JSON string with trailing commas removed, or the original string if no 
-      trailing comma is found.
-    """
-    return re.sub(r",\s*(?=[}\]])", "", json_string)
-
-def print_table(iterable, headers_and_keys, print_headers=True):
+def print_table(iterable, headers_and_keys, print_headers=True, widths=None, sample_size=TABLE_SAMPLE_SIZE):
     """ 
     Print an iterable in table format.  
-    The iterable may not be safe to walk multiple times, so we must walk it
-    only once -- however, to let us write things naturally, convert it to a
-    list and we can assume it is safe to walk repeatedly
+    The iterable may not be safe to walk multiple times (e.g. a paginated API
+    response), so it is walked only once and each keyfunc is evaluated once
+    per row.  Up to sample_size rows are buffered to measure the column
+    widths.  If the iterable ends within the sample, the table is aligned
+    exactly; otherwise the widths measured on the sample are kept and the
+    remaining rows are printed as they arrive, in constant memory, with
+    longer values overflowing their column.  Passing widths fixes the column
+    widths and streams every row without buffering.
     """
 
-    iterable = list(iterable)
-
     # extract headers and keys as separate lists
     headers = [h for (h, k) in headers_and_keys]
     keys = [k for (h, k) in headers_and_keys]
@@ -152,22 +201,26 @@ def print_table(iterable, headers_and_keys, print_headers=True):
     # convert all keys to keyfuncs
     keyfuncs = [_key_to_keyfunc(key) for key in keys]
 
-    # use the iterable to find the max width of an element for each column, in
-    # the same order as the headers_and_keys array
-    # use a special function to handle empty iterable
-    def get_max_colwidth(kf):
-        def _safelen(x):
-            try:
-                return len(x)
-            except TypeError:
-                return len(str(x))
-        lengths = [_safelen(kf(i)) for i in iterable]
-        if not lengths:
-            return 0
-        else:
-             return max(lengths)
-
-    widths = [get_max_colwidth(kf) for kf in keyfuncs]
+    def _safelen(x):
+        try:
+            return len(x)
+        except TypeError:
+            return len(str(x))
+
+    def none_to_null(val):
+        if val is None:
+            return "NULL"
+        return val
+
+    rows = ([kf(i) for kf in keyfuncs] for i in iterable)
+
+    if widths is None:
+        # use a sample of the rows to find the max width of an element for
+        # each column, in the same order as the headers_and_keys array
+        sample = list(itertools.islice(rows, sample_size))
+        widths = [max((_safelen(row[n]) for row in sample), default=0) for n in range(len(keyfuncs))]
+    else:
+        sample = []
 
     # handle the case in which the column header is the widest thing
     widths = [max(w, len(h)) for w, h in zip(widths, headers)]
@@ -175,21 +228,45 @@ def print_table(iterable, headers_and_keys, print_headers=True):
     # create a format string based on column widths
     format_str = " | ".join("{:" + str(w) + "}" for w in widths)
 
-    def none_to_null(val):
-        if val is None:
-            return "NULL"
-        return val
-
     # print headers
     if print_headers:
         print(format_str.format(*[h for h in headers]))
         print(format_str.format(*["-" * w for w in widths]))
-    # print the rows of data
-    for i in iterable:
-        print(format_str.format(*[none_to_null(kf(i)) for kf in keyfuncs]))
+    # print the rows of data, then stream whatever follows the sample
+    for row in itertools.chain(sample, rows):
+        print(format_str.format(*[none_to_null(v) for v in row]))
 
     return
 
+def iter_records(iterable, headers_and_keys):
+    """ Yield one dict per item of iterable, keyed by record_keys(headers_and_keys). """
+    names = record_keys(headers_and_keys)
+    keyfuncs = [_key_to_keyfunc(k) for h, k in headers_and_keys]
+    for item in iterable:
+        yield {name: kf(item) for name, kf in zip(names, keyfuncs)}
+
+def print_records(iterable, headers_and_keys, output_format="table", fp=None):
+    """
+    Print an iterable of items in the requested output format.  'table' uses
+    print_table; 'json', 'ndjson' and 'csv' serialize each item as soon as it
+    is pulled from the iterable, so paginated responses are written out as
+    their pages arrive.
+    """
+    if output_format == "table":
+        return print_table(iterable, headers_and_keys)
+
+    fp = fp or sys.stdout
+    records = iter_records(iterable, headers_and_keys)
+    if output_format == "json":
+        write_json(records, fp)
+    elif output_format == "ndjson":
+        write_ndjson(records, fp)
+    elif output_format == "csv":
+        write_csv(records, fp, record_keys(headers_and_keys))
+    else:
+        raise ValueError(f"Unknown output format: {output_format}")
+    fp.flush()
+
 def _key_to_keyfunc(k):
     """
     We allow for 'keys' which are functions that map columns onto value
@@ -200,7 +277,7 @@ def _key_to_keyfunc(k):
     """
     # if the key is a string, then the "keyfunc" is just a basic lookup
     # operation -- return that
-    if isinstance(k, six.string_types):
+    if isinstance(k, str):
         def lookup(x):
             return x[k]
 
@@ -210,19 +287,25 @@ def _key_to_keyfunc(k):
     return k
 
 def configure_log():
-   """ Congigure logging """
-   logfile = os.path.join(LOGPATH, LOGFILE)
-   loglevel = 'INFO'
-   format = '%(asctime)s - %(name)s - %(lineno)d - %(levelname)s - %(message)s'
-   logging.basicConfig(
-       level=loglevel, 
-       format=format,
-       handlers=[
-           logging.StreamHandler(),
-           logging.FileHandler(logfile)
-       ]
-    )
-
+   """
+   Configure logging.  Records are printed to stderr and appended to the log
+   file by a background thread (see lib.logs.queued_logging), so a slow file
+   system never delays the command.  The log file is set by DSGLOBUS_LOG_FILE
+   (an empty value disables it) and is not opened until the first record is
+   written.
+   """
+   logfile = os.environ.get("DSGLOBUS_LOG_FILE", os.path.join(LOGPATH, LOGFILE))
+   formatter = logging.Formatter('%(asctime)s - %(name)s - %(lineno)d - %(levelname)s - %(message)s')
+
+   handlers = []
+   if logfile:
+       file_handler = logging.FileHandler(logfile, delay=True)
+       file_handler.setFormatter(formatter)
+       handlers.append(file_handler)
+   stream_handler = logging.StreamHandler()
+   stream_handler.setFormatter(formatter)
+
+   queued_logging(handlers, direct_handlers=[stream_handler])
    return
 
 class CustomEpilog(click.Group):
@@ -238,19 +321,53 @@ __all__ = (
     "endpoint_options",
     "path_options",
     "namespace_options",
+    "multi_namespace_options",
+    "validate_namespaces",
+    "format_options",
     "validate_dsid",
     "valid_uuid",
     "validate_endpoint",
     "prettyprint_json",
-    "process_json_stream",
+    "iter_manifest",
+    "list_directory",
+    "walk_tree",
+    "SubtreeSizeCache",
+    "ListingCache",
+    "CachingTransferClient",
+    "prefetch",
+    "map_unordered",
+    "RateLimiter",
+    "iter_task_pages",
+    "task_list_by_id",
+    "bulk_get_tasks",
+    "task_progress",
+    "AdaptivePollInterval",
+    "TERMINAL_STATUSES",
+    "iter_successful_transfer_pages",
+    "iter_task_event_pages",
+    "EventSummary",
+    "ChunkSubmitter",
+    "chunk_label",
+    "submit_chunks",
     "colon_formatted_print",
     "print_table",
+    "print_records",
+    "iter_records",
+    "record_keys",
+    "write_ndjson",
+    "human_size",
     "configure_log",
+    "queued_logging",
     "token_storage_adapter",
     "auth_client",
     "transfer_client",
     "ENDPOINT_ALIASES",
+    "NAMESPACES",
     "CustomEpilog",
     "TACC_GLOBUS_ENDPOINT",
     "TACC_BASE_PATH",
+    "DU_CACHE_FILE",
+    "LS_CACHE_FILE",
+    "LS_CACHE_TTL",
+    "LS_CACHE_MAX_BYTES",
 )
@@ -1,10 +1,12 @@
+import threading
+
 import globus_sdk
 from globus_sdk.tokenstorage import JSONTokenStorage
+from requests.adapters import HTTPAdapter
 from .config import (
     QUASAR_CLIENT_ID,
-    TACC_CLIENT_ID,
-    CLIENT_TOKEN_CONFIG,
-    TACC_TOKEN_CONFIG,
+    NAMESPACES,
+    HTTP_POOL_MAXSIZE,
 )
 
 AUTH_RESOURCE_SERVER = "auth.globus.org"
@@ -12,46 +14,106 @@ AUTH_SCOPES = ["openid", "profile"]
 TRANSFER_RESOURCE_SERVER = "transfer.api.globus.org"
 TRANSFFER_SCOPES = "urn:globus:auth:scope:transfer.api.globus.org:all"
 
+# guards the per-namespace caches below, which may be filled from worker threads
+_pool_lock = threading.RLock()
+# serializes token file writes; namespaces may share one JSON token file
+_token_write_lock = threading.Lock()
+
+def _namespace_config(namespace):
+    """ Return the (client ID, token storage path) pair for a namespace. """
+    return NAMESPACES.get(namespace, NAMESPACES["DEFAULT"])
+
 def token_storage_adapter(namespace="DEFAULT"):
-    """ Return a JSONTokenStorage instance for the specified namespace. If an instance already exists, return the existing instance. """
-    if namespace == "tacc":
-        json_config = TACC_TOKEN_CONFIG
-    else:
-        json_config = CLIENT_TOKEN_CONFIG
-    
-    if not hasattr(token_storage_adapter, "_instance"):
-        token_storage_adapter._instance = JSONTokenStorage(json_config, namespace=namespace)
-    return token_storage_adapter._instance
+    """ Return the JSONTokenStorage instance for the specified namespace, creating it on first use. """
+    with _pool_lock:
+        if not hasattr(token_storage_adapter, "_instances"):
+            token_storage_adapter._instances = {}
+        if namespace not in token_storage_adapter._instances:
+            _, json_config = _namespace_config(namespace)
+            token_storage_adapter._instances[namespace] = JSONTokenStorage(json_config, namespace=namespace)
+        return token_storage_adapter._instances[namespace]
 
 def internal_auth_client(client_id=QUASAR_CLIENT_ID):
-    """ Return a NativeAppAuthClient instance for the specified client ID. """
-    return globus_sdk.NativeAppAuthClient(client_id, app_name="dsglobus")
+    """ Return the NativeAppAuthClient instance for the specified client ID, creating it on first use. """
+    with _pool_lock:
+        if not hasattr(internal_auth_client, "_instances"):
+            internal_auth_client._instances = {}
+        if client_id not in internal_auth_client._instances:
+            internal_auth_client._instances[client_id] = globus_sdk.NativeAppAuthClient(client_id, app_name="dsglobus")
+        return internal_auth_client._instances[client_id]
 
 def auth_client():
     authorizer = globus_sdk.ClientCredentialsAuthorizer(internal_auth_client(), AUTH_SCOPES)
     return globus_sdk.AuthClient(authorizer=authorizer, app_name="dsglobus")
 
+class _ThreadSafeRefreshTokenAuthorizer(globus_sdk.RefreshTokenAuthorizer):
+    """
+    RefreshTokenAuthorizer shared by the worker threads of a pooled client.
+    Token checks are serialized, so an expired access token is refreshed by
+    one thread while the others wait for, and then reuse, the new token.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self._refresh_lock = threading.RLock()
+        super().__init__(*args, **kwargs)
+
+    def ensure_valid_token(self):
+        with self._refresh_lock:
+            super().ensure_valid_token()
+
+    def get_authorization_header(self):
+        with self._refresh_lock:
+            return super().get_authorization_header()
+
+    def handle_missing_authorization(self):
+        with self._refresh_lock:
+            return super().handle_missing_authorization()
+
+def _store_tokens(storage_adapter):
+    """ on_refresh callback writing refreshed tokens to storage, one write at a time. """
+    def on_refresh(token_response):
+        with _token_write_lock:
+            storage_adapter.store_token_response(token_response)
+    return on_refresh
+
+def _mount_connection_pool(client):
+    """
+    Size the keep-alive HTTPS connection pool of a client's session so that
+    concurrent API calls from worker threads reuse connections instead of
+    opening (and TLS handshaking) new ones.
+    """
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=HTTP_POOL_MAXSIZE)
+    client.transport.session.mount("https://", adapter)
+    return client
+
 def transfer_client(namespace="DEFAULT"):
-    """ Return a TransferClient instance for the specified namespace. """
-
-    if namespace == 'tacc':
-        client_id = TACC_CLIENT_ID
-    else:
-        client_id = QUASAR_CLIENT_ID
-
-    auth_client = internal_auth_client(client_id=client_id)
-
-    storage_adapter = token_storage_adapter(namespace)
-    token_data = storage_adapter.get_token_data(TRANSFER_RESOURCE_SERVER)
-    access_token = token_data.access_token
-    refresh_token = token_data.refresh_token
-    access_token_expires = token_data.expires_at_seconds
-
-    authorizer = globus_sdk.RefreshTokenAuthorizer(
-        refresh_token,
-        auth_client,
-        access_token=access_token,
-        expires_at=int(access_token_expires),
-        on_refresh=storage_adapter.store_token_response(auth_client.oauth2_refresh_token(refresh_token)),
-    )
-    return globus_sdk.TransferClient(authorizer=authorizer, app_name="dsglobus")
\ No newline at end of file
+    """
+    Return the pooled TransferClient instance for the specified namespace.  The
+    client, its auth client and its HTTP session are built once per namespace
+    and reused for the life of the process.  The stored access token is used
+    as-is until it nears expiry; only then does the authorizer call the refresh
+    grant and write the new tokens back to storage.  Refreshes and token file
+    writes are serialized across threads.
+    """
+    with _pool_lock:
+        if not hasattr(transfer_client, "_clients"):
+            transfer_client._clients = {}
+        if namespace in transfer_client._clients:
+            return transfer_client._clients[namespace]
+
+        client_id, _ = _namespace_config(namespace)
+        auth_client = internal_auth_client(client_id=client_id)
+
+        storage_adapter = token_storage_adapter(namespace)
+        token_data = storage_adapter.get_token_data(TRANSFER_RESOURCE_SERVER)
+
+        authorizer = _ThreadSafeRefreshTokenAuthorizer(
+            token_data.refresh_token,
+            auth_client,
+            access_token=token_data.access_token,
+            expires_at=int(token_data.expires_at_seconds),
+            on_refresh=_store_tokens(storage_adapter),
+        )
+        client = globus_sdk.TransferClient(authorizer=authorizer, app_name="dsglobus")
+        transfer_client._clients[namespace] = _mount_connection_pool(client)
+        return client
@@ -0,0 +1,178 @@
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+import logging
+logger = logging.getLogger(__name__)
+
+class SubtreeSizeCache:
+    """
+    On-disk cache of directory subtree totals, keyed by endpoint, directory
+    path and the directory's last modified time.  A directory's mtime only
+    changes when entries are added to or removed from it, not when its
+    subdirectories change, so a cached total goes stale when anything below
+    the directory's own entries changes.  It suits archive trees that only
+    grow at the top level.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        try:
+            with open(path) as f:
+                self.entries = json.load(f)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logger.warning(f"[SubtreeSizeCache] Ignoring unreadable cache file {path}: {e}")
+
+    def get(self, endpoint, path, mtime):
+        """ Return the cached (files, bytes) totals for a directory, or None. """
+        entry = self.entries.get(endpoint, {}).get(path)
+        if entry and entry[0] == mtime:
+            return entry[1], entry[2]
+        return None
+
+    def put(self, endpoint, path, mtime, files, nbytes):
+        self.entries.setdefault(endpoint, {})[path] = [mtime, files, nbytes]
+
+    def save(self):
+        """ Atomically write the cache back to disk. """
+        directory = os.path.dirname(self.path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=".du-cache")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(self.entries, f)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            logger.warning(f"[SubtreeSizeCache] Unable to save cache file {self.path}: {e}")
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+class CachedListing:
+    """ Stand-in for an operation_ls response served from a ListingCache. """
+
+    def __init__(self, data):
+        self.data = data
+
+    def __getitem__(self, key):
+        return self.data[key]
+
+    def __iter__(self):
+        return iter(self.data["DATA"])
+
+    def get(self, key, default=None):
+        return self.data.get(key, default)
+
+class ListingCache:
+    """
+    SQLite cache of operation_ls results, keyed by endpoint, path and
+    filter.  Entries older than ``ttl`` seconds are treated as misses, and
+    once the stored listings exceed ``max_bytes`` the least recently used
+    ones are evicted.  Safe to share between the threads of a walk_tree;
+    hits and misses are counted for reporting.
+    """
+
+    # how many puts between eviction passes
+    EVICT_EVERY = 100
+
+    def __init__(self, path, ttl, max_bytes):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.puts = 0
+        self.lock = threading.Lock()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.db = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS listings ("
+            " endpoint TEXT, path TEXT, filter TEXT, response TEXT,"
+            " size INTEGER, stored REAL, used REAL,"
+            " PRIMARY KEY (endpoint, path, filter))"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS listings_used ON listings (used)")
+
+    def get(self, endpoint, path, filter):
+        """ Return the cached listing as a CachedListing, or None if missing or expired. """
+        now = time.time()
+        with self.lock:
+            row = self.db.execute(
+                "SELECT response, stored FROM listings WHERE endpoint=? AND path=? AND filter=?",
+                (endpoint, path or "", filter or ""),
+            ).fetchone()
+            if row is None or row[1] < now - self.ttl:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.db.execute(
+                "UPDATE listings SET used=? WHERE endpoint=? AND path=? AND filter=?",
+                (now, endpoint, path or "", filter or ""),
+            )
+        return CachedListing(json.loads(row[0]))
+
+    def put(self, endpoint, path, filter, response):
+        """ Store the path and entries of an operation_ls response. """
+        text = json.dumps({"path": response["path"], "DATA": list(response)})
+        now = time.time()
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO listings VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (endpoint, path or "", filter or "", text, len(text), now, now),
+            )
+            self.puts += 1
+            if self.puts % self.EVICT_EVERY == 0:
+                self._evict()
+
+    def _evict(self):
+        self.db.execute("DELETE FROM listings WHERE stored < ?", (time.time() - self.ttl,))
+        total = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM listings").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        excess = total - self.max_bytes
+        evict = []
+        for endpoint, path, filter, size in self.db.execute(
+            "SELECT endpoint, path, filter, size FROM listings ORDER BY used"
+        ):
+            evict.append((endpoint, path, filter))
+            excess -= size
+            if excess <= 0:
+                break
+        self.db.executemany("DELETE FROM listings WHERE endpoint=? AND path=? AND filter=?", evict)
+
+    def close(self):
+        with self.lock:
+            self._evict()
+            self.db.close()
+
+class CachingTransferClient:
+    """
+    Wrapper around a TransferClient that serves operation_ls calls from a
+    ListingCache.  With refresh, every listing is fetched again and the
+    cache is updated.  Any other method is passed through to the client.
+    """
+
+    def __init__(self, tc, cache, refresh=False):
+        self.tc = tc
+        self.cache = cache
+        self.refresh = refresh
+
+    def __getattr__(self, name):
+        return getattr(self.tc, name)
+
+    def operation_ls(self, endpoint, path=None, filter=None, **kwargs):
+        if kwargs:
+            return self.tc.operation_ls(endpoint, path=path, filter=filter, **kwargs)
+        if not self.refresh:
+            cached = self.cache.get(endpoint, path, filter)
+            if cached is not None:
+                return cached
+        response = self.tc.operation_ls(endpoint, path=path, filter=filter)
+        self.cache.put(endpoint, path, filter, response)
+        return response
@@ -0,0 +1,105 @@
+import itertools
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+_DONE = object()
+
+def prefetch(iterable, depth=1):
+    """
+    Iterate over iterable in a background thread, keeping up to ``depth``
+    items ready ahead of the consumer.  Meant for paginated API responses:
+    while the caller processes one page, the next one is already being
+    fetched.  Exceptions raised by the iterable are re-raised in the
+    consumer, and the background thread stops if the consumer does.
+
+    The background thread starts right away, not on first iteration, so
+    several prefetched streams (e.g. one per namespace) fetch concurrently.
+    """
+    items = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+
+    def put(entry):
+        while not stop.is_set():
+            try:
+                items.put(entry, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in iterable:
+                if not put((item, None)):
+                    return
+        except BaseException as e:
+            put((_DONE, e))
+        else:
+            put((_DONE, None))
+
+    thread = threading.Thread(target=produce, daemon=True)
+    thread.start()
+    return _consume(items, stop)
+
+def _consume(items, stop):
+    try:
+        while True:
+            item, error = items.get()
+            if item is _DONE:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        stop.set()
+
+def map_unordered(func, iterable, workers):
+    """
+    Call func on each item of iterable with at most ``workers`` calls in
+    flight, yielding (item, result, error) tuples as the calls complete.
+    The iterable is read lazily, one item per free worker, so a large
+    manifest is never held in memory and a caller that wants to stop early
+    can make its iterable end; the calls already in flight are still
+    yielded.
+    """
+    iterator = iter(iterable)
+    pending = {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        while True:
+            for item in itertools.islice(iterator, workers - len(pending)):
+                pending[executor.submit(func, item)] = item
+            if not pending:
+                return
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                item = pending.pop(future)
+                error = future.exception()
+                yield item, None if error else future.result(), error
+
+class RateLimiter:
+    """
+    Token bucket shared between threads, allowing ``rate`` calls per second
+    on average and bursts of up to ``burst`` calls.  acquire() blocks until
+    the caller may proceed.
+    """
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.capacity = max(burst, 1)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
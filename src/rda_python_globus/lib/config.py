@@ -8,12 +8,34 @@ TACC_CLIENT_ID = "3320e8d9-030c-41d0-94f0-2357ae2e3e4d"
 CLIENT_TOKEN_CONFIG = '/glade/u/home/gdexdata/globus/globus_gdex_quasar_tokens.json'
 TACC_TOKEN_CONFIG = '/glade/u/home/gdexdata/globus/globus_tacc_transfer_tokens.json'
 
+""" Globus client namespaces: (client ID, token storage) """
+NAMESPACES = {
+    "DEFAULT": (QUASAR_CLIENT_ID, CLIENT_TOKEN_CONFIG),
+    "tacc": (TACC_CLIENT_ID, TACC_TOKEN_CONFIG),
+}
+
+""" Maximum number of pooled keep-alive HTTPS connections per client """
+HTTP_POOL_MAXSIZE = 32
+
 """ Log file path and name """
 GDEX_BASE_PATH = '/glade/campaign/collections/gdex'
 SCRATCH_PATH = '/lustre/desc1/scratch/tcram'
 LOGPATH = os.path.join(SCRATCH_PATH, 'logs/globus')
 LOGFILE = 'dsglobus-app.log'
 
+""" Logging defaults, overridden by the DSGLOBUS_LOG_FILE, DSGLOBUS_LOG_LEVEL,
+DSGLOBUS_LOG_QUEUE_SIZE and DSGLOBUS_LOG_OVERFLOW environment variables """
+LOG_LEVEL = 'INFO'
+LOG_QUEUE_SIZE = 10000  # records waiting for the log writer thread
+LOG_OVERFLOW = 'drop-new'  # 'drop-new', 'drop-old' or 'block' when the queue is full
+
+""" Local cache files """
+CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "dsglobus")
+DU_CACHE_FILE = os.path.join(CACHE_PATH, "du-cache.json")
+LS_CACHE_FILE = os.path.join(CACHE_PATH, "ls-cache.sqlite")
+LS_CACHE_TTL = 3600  # seconds
+LS_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
 """ Endpoint IDs """
 RDA_DATASET_ENDPOINT = 'b6b5d5e8-eb14-4f6b-8928-c02429d67998'
 RDA_DSRQST_ENDPOINT = 'e6cd9f43-935c-42e3-8d19-764d03241719'
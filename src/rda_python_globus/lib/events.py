@@ -0,0 +1,112 @@
+import collections
+import re
+
+# absolute or home-relative paths, e.g. '/glade/campaign/file.nc' or '~/file.nc'
+_PATH = re.compile(r"(?<![\w.:/])~?/[^\s'\"`,;()\[\]{}<>]+")
+_UUID = re.compile(r"\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b", re.I)
+_HOST_PORT = re.compile(r"\b\d{1,3}(?:\.\d{1,3}){3}(?::\d+)?\b")
+# numbers such as byte offsets and process IDs, but not three digit FTP/HTTP status codes
+_NUMBER = re.compile(r"\b(?!\d{3}\b)\d+\b")
+_SPACE = re.compile(r"\s+")
+
+# longest signature kept, in characters
+SIGNATURE_LENGTH = 200
+
+def event_paths(text):
+    """ The distinct file system paths mentioned in an event's text. """
+    return set(_PATH.findall(text or ""))
+
+def event_signature(event):
+    """
+    Normalized form of an event's description and details, with paths,
+    UUIDs, IP addresses and numbers other than status codes replaced by
+    placeholders, so that the same fault on different files maps to the
+    same signature.
+    """
+    text = f"{event.get('description') or ''} {event.get('details') or ''}"
+    text = _PATH.sub("<path>", text)
+    text = _UUID.sub("<uuid>", text)
+    text = _HOST_PORT.sub("<host>", text)
+    text = _NUMBER.sub("<n>", text)
+    return _SPACE.sub(" ", text).strip()[:SIGNATURE_LENGTH]
+
+class _Group:
+    __slots__ = ("count", "first_time", "last_time")
+
+    def __init__(self):
+        self.count = 0
+        self.first_time = None
+        self.last_time = None
+
+    def add(self, time):
+        self.count += 1
+        if time:
+            if self.first_time is None or time < self.first_time:
+                self.first_time = time
+            if self.last_time is None or time > self.last_time:
+                self.last_time = time
+
+class EventSummary:
+    """
+    Incremental aggregate of task events by event code and by (code,
+    signature), with per-path counts.  Only counters are kept, so memory
+    depends on the number of distinct codes, signatures and paths rather
+    than on the number of events.
+    """
+
+    def __init__(self):
+        self.total = 0
+        # number of events the service reports for the task, if known
+        self.available = None
+        self.codes = collections.defaultdict(_Group)
+        self.signatures = collections.defaultdict(_Group)
+        self.paths = collections.Counter()
+        self.signature_paths = collections.defaultdict(collections.Counter)
+
+    def add(self, event):
+        time = event.get("time")
+        key = (event.get("code"), event_signature(event))
+        self.total += 1
+        self.codes[event.get("code")].add(time)
+        self.signatures[key].add(time)
+        paths = event_paths(event.get("details"))
+        self.paths.update(paths)
+        self.signature_paths[key].update(paths)
+
+    def truncated(self, max_results=None):
+        """
+        True if fewer events were added than the service reports for the
+        task (up to max_results), e.g. because paging stopped at the API
+        limit.
+        """
+        if self.available is None:
+            return False
+        expected = self.available if max_results is None else min(self.available, max_results)
+        return self.total < expected
+
+    def by_code(self):
+        """ Yield code groups as dicts, most frequent first. """
+        for code, group in sorted(self.codes.items(), key=lambda kv: -kv[1].count):
+            yield {
+                "code": code,
+                "count": group.count,
+                "first_time": group.first_time,
+                "last_time": group.last_time,
+            }
+
+    def by_signature(self, top=3):
+        """ Yield (code, signature) groups as dicts with their top paths, most frequent first. """
+        for (code, signature), group in sorted(self.signatures.items(), key=lambda kv: -kv[1].count):
+            yield {
+                "code": code,
+                "count": group.count,
+                "first_time": group.first_time,
+                "last_time": group.last_time,
+                "signature": signature,
+                "top_paths": [path for path, _ in self.signature_paths[(code, signature)].most_common(top)],
+            }
+
+    def top_paths(self, n=10):
+        """ Yield the n paths named in the most events, as dicts. """
+        for path, count in self.paths.most_common(n):
+            yield {"path": path, "count": count}
@@ -0,0 +1,134 @@
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+
+from .config import LOG_LEVEL, LOG_QUEUE_SIZE, LOG_OVERFLOW
+
+OVERFLOW_POLICIES = ("drop-new", "drop-old", "block")
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler for a bounded queue.  When the queue is full, 'drop-new'
+    discards the incoming record, 'drop-old' discards the oldest queued
+    record to make room, and 'block' waits for the writer thread.  Dropped
+    records are counted in ``dropped``.
+    """
+
+    def __init__(self, queue, overflow=LOG_OVERFLOW):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown log overflow policy: {overflow}")
+        super().__init__(queue)
+        self.overflow = overflow
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+
+    def enqueue(self, record):
+        if self.overflow == "block":
+            self.queue.put(record)
+            return
+        try:
+            self.queue.put_nowait(record)
+            return
+        except queue.Full:
+            pass
+        if self.overflow == "drop-old":
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                pass
+            try:
+                self.queue.put_nowait(record)
+            except queue.Full:
+                pass
+        with self._dropped_lock:
+            self.dropped += 1
+
+class _QueueListener(logging.handlers.QueueListener):
+    def enqueue_sentinel(self):
+        # the queue may be full at shutdown; the writer thread will make room
+        self.queue.put(self._sentinel)
+
+    def stop(self):
+        if self._thread is not None:
+            super().stop()
+
+def _log_settings(level, queue_size, overflow):
+    """
+    Resolve the level, queue size and overflow policy of queued_logging.
+    Arguments take precedence and must be valid.  Otherwise the
+    DSGLOBUS_LOG_* environment variables are used; an invalid variable is
+    reported in one warning on stderr and replaced by the config default,
+    so a typo never stops a command from running.
+    """
+    invalid = []
+
+    if level is None:
+        level = os.environ.get("DSGLOBUS_LOG_LEVEL") or LOG_LEVEL
+        if not isinstance(logging.getLevelName(level.upper()), int):
+            invalid.append(f"DSGLOBUS_LOG_LEVEL={level!r}")
+            level = LOG_LEVEL
+    elif not isinstance(logging.getLevelName(level.upper()), int):
+        raise ValueError(f"Unknown log level: {level}")
+
+    if queue_size is None:
+        value = os.environ.get("DSGLOBUS_LOG_QUEUE_SIZE") or str(LOG_QUEUE_SIZE)
+        try:
+            queue_size = int(value)
+        except ValueError:
+            queue_size = 0
+        # a queue.Queue with maxsize 0 would be unbounded
+        if queue_size < 1:
+            invalid.append(f"DSGLOBUS_LOG_QUEUE_SIZE={value!r}")
+            queue_size = LOG_QUEUE_SIZE
+    elif queue_size < 1:
+        raise ValueError(f"Log queue size must be at least 1: {queue_size}")
+
+    if overflow is None:
+        overflow = os.environ.get("DSGLOBUS_LOG_OVERFLOW") or LOG_OVERFLOW
+        if overflow not in OVERFLOW_POLICIES:
+            invalid.append(f"DSGLOBUS_LOG_OVERFLOW={overflow!r}")
+            overflow = LOG_OVERFLOW
+
+    if invalid:
+        sys.stderr.write(f"dsglobus: ignoring invalid logging setting(s) {', '.join(invalid)}; using the defaults\n")
+    return level.upper(), queue_size, overflow
+
+def queued_logging(handlers, logger=None, level=None, direct_handlers=(), queue_size=None, overflow=None):
+    """
+    Send the records of ``logger`` (the root logger by default) to
+    ``handlers`` through a bounded queue drained by a background
+    QueueListener thread, so a slow log file system never blocks the
+    caller.  ``direct_handlers``, such as a console StreamHandler, are
+    attached to the logger as usual.
+
+    level, queue_size and overflow default to the DSGLOBUS_LOG_LEVEL,
+    DSGLOBUS_LOG_QUEUE_SIZE and DSGLOBUS_LOG_OVERFLOW environment variables,
+    then to the values in config (see _log_settings).  The listener is stopped, flushing the
+    queue, at interpreter exit, and the number of records dropped because
+    the queue was full is reported on stderr.  Returns the listener.
+    """
+    logger = logger if logger is not None else logging.getLogger()
+    level, queue_size, overflow = _log_settings(level, queue_size, overflow)
+
+    queue_handler = NonBlockingQueueHandler(queue.Queue(maxsize=queue_size), overflow=overflow)
+    listener = _QueueListener(queue_handler.queue, *handlers, respect_handler_level=True)
+    logger.setLevel(level)
+    logger.addHandler(queue_handler)
+    for handler in direct_handlers:
+        logger.addHandler(handler)
+    listener.start()
+
+    def stop():
+        logger.removeHandler(queue_handler)
+        listener.stop()
+        for handler in handlers:
+            handler.close()
+        if queue_handler.dropped:
+            sys.stderr.write(f"dsglobus: {queue_handler.dropped} log records dropped because the log queue was full\n")
+
+    atexit.register(stop)
+    return listener
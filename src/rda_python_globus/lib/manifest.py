@@ -0,0 +1,235 @@
+import json
+import re
+import typing as t
+
+import click
+
+# characters read from the manifest stream at a time
+CHUNK_SIZE = 64 * 1024
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = re.compile(r'\s*')
+_BOM = "\ufeff"
+
+def _bad_manifest(msg):
+    return click.BadParameter(msg, param_hint="'--batch'")
+
+class _Buffer:
+    """
+    Sliding window over a text stream.  Consumed text is dropped as parsing
+    advances, so memory use is bounded by the chunk size plus the size of the
+    largest single manifest entry.
+    """
+
+    def __init__(self, stream: t.TextIO):
+        self.stream = stream
+        self.text = ""
+        self.pos = 0
+        self.eof = False
+        self.started = False
+
+    def fill(self) -> bool:
+        """ Read another chunk, returning False at end of stream. """
+        if self.eof:
+            return False
+        chunk = self.stream.read(CHUNK_SIZE)
+        if not chunk:
+            self.eof = True
+            return False
+        if not self.started:
+            self.started = True
+            if chunk.startswith(_BOM):
+                chunk = chunk[len(_BOM):]
+        self.text = self.text[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """ Skip whitespace and return the next character, or '' at end of stream. """
+        while True:
+            self.pos = _WHITESPACE.match(self.text, self.pos).end()
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self.fill():
+                return ""
+
+    def rest(self) -> t.Iterator[str]:
+        """ Yield the remaining unparsed text line by line. """
+        pending = self.text[self.pos:]
+        self.text, self.pos = "", 0
+        while True:
+            lines = pending.split("\n")
+            pending = lines.pop()
+            yield from lines
+            if self.eof:
+                break
+            chunk = self.stream.read(CHUNK_SIZE)
+            if not chunk:
+                self.eof = True
+                break
+            pending += chunk
+        if pending:
+            yield pending
+
+def _drop_trailing_comma(buf: _Buffer, error: json.JSONDecodeError) -> bool:
+    """
+    If a decode error is a closing brace or bracket preceded by a comma, as
+    in ``{"a": 1,}``, remove the comma from the buffer and return True.
+    """
+    if error.pos >= len(buf.text) or buf.text[error.pos] not in "}]":
+        return False
+    comma = len(buf.text[:error.pos].rstrip()) - 1
+    if comma < buf.pos or buf.text[comma] != ",":
+        return False
+    buf.text = buf.text[:comma] + buf.text[comma + 1:]
+    return True
+
+def _decode(buf: _Buffer, index: int):
+    """
+    Decode the JSON value at buf.pos, reading more of the stream if the
+    value is split across chunks.  Trailing commas inside the value are
+    tolerated.
+    """
+    while True:
+        try:
+            return _decoder.raw_decode(buf.text, buf.pos)
+        except json.JSONDecodeError as e:
+            if _drop_trailing_comma(buf, e):
+                continue
+            # the element may just be split across chunks
+            if not buf.fill():
+                raise _bad_manifest(f"Invalid JSON in entry {index + 1}: {e.msg}")
+
+def _find_files_array(buf: _Buffer) -> bool:
+    """
+    Look for a ``"files"`` array among the keys of the JSON object starting
+    at buf.pos.  If found, position the buffer just after its opening
+    bracket and return True.  Return False, leaving the buffer where it was,
+    if the object has no such key (e.g. the first line of an NDJSON
+    manifest).  The values of keys before "files" are kept in memory while
+    scanning, so they should be small.
+    """
+    while True:
+        i = buf.pos + 1
+        try:
+            while True:
+                i = _WHITESPACE.match(buf.text, i).end()
+                ch = buf.text[i]
+                if ch == "}":
+                    return False
+                if ch == ",":
+                    i += 1
+                    continue
+                key, i = _decoder.raw_decode(buf.text, i)
+                i = _WHITESPACE.match(buf.text, i).end()
+                if buf.text[i] != ":":
+                    return False
+                i = _WHITESPACE.match(buf.text, i + 1).end()
+                if key == "files" and buf.text[i] == "[":
+                    buf.pos = i + 1
+                    return True
+                _, i = _decoder.raw_decode(buf.text, i)
+        except (IndexError, json.JSONDecodeError):
+            # the object may just be split across chunks; rescan with more text
+            if not buf.fill():
+                return False
+
+def _iter_json_array(buf: _Buffer) -> t.Iterator[t.Any]:
+    """
+    Yield the elements of a JSON array one at a time.  The buffer must be
+    positioned just after the opening bracket.  Stray commas between or after
+    elements, and trailing commas inside elements, are tolerated.
+    """
+    index = 0
+    while True:
+        ch = buf.peek()
+        if ch == "":
+            raise _bad_manifest("Invalid JSON: unterminated array")
+        if ch == "]":
+            buf.pos += 1
+            return
+        if ch == ",":
+            buf.pos += 1
+            continue
+        value, buf.pos = _decode(buf, index)
+        if buf.pos > CHUNK_SIZE:
+            buf.text, buf.pos = buf.text[buf.pos:], 0
+        index += 1
+        yield value
+
+def _normalize(value, columns, optional, where):
+    """ Convert one manifest entry to a dict keyed by column name. """
+    if isinstance(value, dict):
+        missing = [c for c in columns if c not in value]
+        if missing:
+            raise _bad_manifest(f"{where} is missing {', '.join(missing)}")
+        return value
+    if isinstance(value, str) and len(columns) == 1:
+        return {columns[0]: value}
+    if isinstance(value, list) and len(columns) <= len(value) <= len(columns) + len(optional):
+        return dict(zip(columns + optional, value))
+    raise _bad_manifest(f"{where} must provide {', '.join(columns)}")
+
+def iter_manifest(
+    stream: t.TextIO,
+    columns: t.Sequence[str],
+    optional: t.Sequence[str] = (),
+) -> t.Iterator[t.Dict[str, t.Any]]:
+    """
+    Incrementally parse a batch manifest, yielding one entry at a time as a
+    dict with (at least) the keys given in ``columns``.
+
+    The manifest layout is detected from its first non-blank character:
+
+    - JSON: an array of entries, or an object wrapping the array as
+      ``{"files": [...]}`` (other keys of the object are ignored).  Trailing
+      commas and a leading byte order mark are tolerated.
+    - NDJSON: one JSON object per line
+    - plain text: one entry per line with columns separated by tabs (or by
+      whitespace if the line has no tabs).  Blank lines and lines starting
+      with '#' are skipped.
+
+    JSON entries may be objects, arrays of column values or, for single
+    column manifests, bare strings.  ``optional`` names extra trailing columns
+    that array and text entries may supply (e.g. a file size).
+    """
+    columns = tuple(columns)
+    optional = tuple(optional)
+    buf = _Buffer(stream)
+
+    first = buf.peek()
+    if first == "":
+        return
+
+    if first == "[":
+        buf.pos += 1
+        for n, value in enumerate(_iter_json_array(buf), 1):
+            yield _normalize(value, columns, optional, f"Manifest entry {n}")
+        return
+
+    if first == "{":
+        if _find_files_array(buf):
+            for n, value in enumerate(_iter_json_array(buf), 1):
+                yield _normalize(value, columns, optional, f"Manifest entry {n}")
+            return
+        for lineno, line in enumerate(buf.rest(), 1):
+            if not line.strip():
+                continue
+            try:
+                value = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise _bad_manifest(f"Invalid JSON at line {lineno}: {e.msg}")
+            yield _normalize(value, columns, optional, f"Manifest line {lineno}")
+        return
+
+    for lineno, line in enumerate(buf.rest(), 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if len(columns) == 1 and not optional:
+            parts = [line]
+        elif "\t" in line:
+            parts = [p.strip() for p in line.split("\t")]
+        else:
+            parts = line.split()
+        yield _normalize(parts, columns, optional, f"Manifest line {lineno}")
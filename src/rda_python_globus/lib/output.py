@@ -0,0 +1,54 @@
+import csv
+import json
+
+OUTPUT_FORMATS = ("table", "json", "ndjson", "csv")
+
+# separator for the values of list fields in a CSV cell
+CSV_LIST_SEPARATOR = ";"
+
+def human_size(nbytes):
+    """ Format a byte count with a binary unit suffix (e.g. 1.5G). """
+    size = float(nbytes)
+    for unit in ("B", "K", "M", "G", "T", "P"):
+        if size < 1024 or unit == "P":
+            return f"{size:.1f}{unit}" if unit != "B" else f"{int(size)}B"
+        size /= 1024
+
+def record_keys(headers_and_keys):
+    """
+    Machine-readable column names for a list of (header, key) pairs: string
+    keys are used as they are, and keyfunc columns are named after their
+    header (e.g. "Last Modified" -> "last_modified").
+    """
+    return [
+        k if isinstance(k, str) else h.lower().replace(" ", "_")
+        for h, k in headers_and_keys
+    ]
+
+def write_json(records, fp):
+    """ Write records as a JSON array, one element at a time. """
+    separator = "\n  "
+    fp.write("[")
+    for record in records:
+        fp.write(separator)
+        fp.write(json.dumps(record, default=str))
+        separator = ",\n  "
+    fp.write("]\n" if separator == "\n  " else "\n]\n")
+
+def write_ndjson(records, fp):
+    """ Write records as newline-delimited JSON, one line per record. """
+    for record in records:
+        fp.write(json.dumps(record, default=str) + "\n")
+
+def write_csv(records, fp, fieldnames):
+    """
+    Write records as CSV with a header row.  List values are joined into a
+    single cell with CSV_LIST_SEPARATOR.
+    """
+    writer = csv.DictWriter(fp, fieldnames=fieldnames, lineterminator="\n")
+    writer.writeheader()
+    for record in records:
+        writer.writerow({
+            key: CSV_LIST_SEPARATOR.join(str(v) for v in value) if isinstance(value, (list, tuple)) else value
+            for key, value in record.items()
+        })
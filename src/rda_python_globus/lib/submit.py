@@ -0,0 +1,104 @@
+import logging
+import queue
+import sys
+import threading
+
+import click
+from globus_sdk import GlobusAPIError, NetworkError
+
+logger = logging.getLogger(__name__)
+
+def chunk_label(label, part):
+    """ Label for one part of a chunked batch submission. """
+    return f"{label} part {part}"
+
+class ChunkSubmitter:
+    """
+    Producer/consumer pipeline for chunked task submissions.  The thread
+    calling run() parses the manifest and builds TransferData or DeleteData
+    chunks, which are handed through a bounded queue to a pool of submitter
+    threads.  Each chunk is submitted as soon as it is full, so network time
+    overlaps parsing, and at most queue_depth + max_concurrent chunks are
+    held in memory at once regardless of the manifest size.
+
+    ``submit(data)`` submits one chunk and returns the API response, and
+    ``on_failure(data)``, if given, is called for each chunk that could not
+    be submitted.  An unexpected exception from either marks the chunk as
+    failed rather than stopping the worker thread, so run() always returns.
+    """
+
+    def __init__(self, submit, max_concurrent, queue_depth, on_failure=None):
+        self.submit = submit
+        self.max_concurrent = max_concurrent
+        self.queue = queue.Queue(maxsize=queue_depth)
+        self.on_failure = on_failure
+        self.results = []
+        self.lock = threading.Lock()
+
+    def _worker(self):
+        while True:
+            job = self.queue.get()
+            if job is None:
+                return
+            part, data = job
+            nitems = len(data['DATA'])
+            try:
+                task_id = self.submit(data)["task_id"]
+                error = None
+            except (GlobusAPIError, NetworkError) as e:
+                task_id = None
+                error = e
+            except Exception as e:
+                logger.exception(f"Unexpected error submitting {data['label']}")
+                task_id = None
+                error = e
+            with self.lock:
+                self.results.append((part, data['label'], nitems, task_id, error))
+                if error is None:
+                    click.echo(f"  {data['label']}: Task ID: {task_id} ({nitems} items)")
+                else:
+                    click.echo(f"  {data['label']}: FAILED ({nitems} items): {error}")
+                    if self.on_failure:
+                        try:
+                            self.on_failure(data)
+                        except Exception as e:
+                            logger.exception(f"Could not record failed part {data['label']}")
+                            click.echo(f"  {data['label']}: could not record failed items: {e}", err=True)
+
+    def run(self, chunks):
+        """
+        Submit every chunk produced by the chunks iterable.  Returns a list
+        of (part, label, nitems, task_id, error) tuples in part order.
+        """
+        workers = [
+            threading.Thread(target=self._worker, daemon=True)
+            for _ in range(self.max_concurrent)
+        ]
+        for worker in workers:
+            worker.start()
+        try:
+            for part, data in enumerate(chunks, 1):
+                self.queue.put((part, data))
+        finally:
+            # let the workers drain what was queued, even if parsing failed
+            for _ in workers:
+                self.queue.put(None)
+            for worker in workers:
+                worker.join()
+        return sorted(self.results, key=lambda r: r[0])
+
+def submit_chunks(submit, chunks, label, max_concurrent, queue_depth, on_failure=None, kind="transfer"):
+    """
+    Submit chunks through a ChunkSubmitter and report the task IDs.  Exits
+    with status 1 if any part could not be submitted.
+    """
+    click.echo(f"Submitting {kind} tasks for '{label}':")
+    submitter = ChunkSubmitter(submit, max_concurrent, queue_depth, on_failure=on_failure)
+    results = submitter.run(chunks)
+
+    failed = [r for r in results if r[4] is not None]
+    click.echo(f"Submitted {len(results) - len(failed)} of {len(results)} {kind} tasks for '{label}'.")
+    if failed:
+        click.echo("Failed parts: {}".format(", ".join(label for _, label, _, _, _ in failed)))
+        sys.exit(1)
+    return results
@@ -0,0 +1,201 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from globus_sdk import GlobusAPIError
+
+import logging
+logger = logging.getLogger(__name__)
+
+# the Transfer API will not page task_list past this many results
+TASK_LIST_MAX_RESULTS = 1000
+
+def _request_time(task):
+    """ Task request time truncated to whole seconds, as accepted by the request_time filter. """
+    return task["request_time"][:19]
+
+def iter_task_pages(tc, filter_string="", requested_after="", requested_before=""):
+    """
+    Yield pages (lists) of task documents, newest first, without the 1000
+    result cap of task_list paging.  Each window of up to 1000 tasks is read
+    with the SDK paginator; the next window is requested with its
+    request_time upper bound moved to the oldest task seen, skipping the
+    tasks at that boundary which were already returned.
+    """
+    before = requested_before
+    boundary = set()
+    while True:
+        window = "request_time:{},{}".format(requested_after or "", before or "") if (requested_after or before) else None
+        window_filter = "/".join(p for p in (filter_string, window) if p)
+
+        seen = 0
+        new = 0
+        last_time = None
+        last_ids = set()
+        for page in tc.paginated.task_list(filter=window_filter, orderby="request_time DESC").pages():
+            tasks = []
+            for task in page:
+                seen += 1
+                if _request_time(task) != last_time:
+                    last_time = _request_time(task)
+                    last_ids = set()
+                last_ids.add(task["task_id"])
+                if task["task_id"] not in boundary:
+                    tasks.append(task)
+            if tasks:
+                new += len(tasks)
+                yield tasks
+
+        if seen < TASK_LIST_MAX_RESULTS or new == 0:
+            return
+        before = last_time
+        boundary = last_ids
+
+# task IDs per task_list 'task_id' filter
+TASK_ID_FILTER_SIZE = 50
+
+# task states in which no further progress will be made
+TERMINAL_STATUSES = ("SUCCEEDED", "FAILED")
+
+def task_list_by_id(tc, task_ids):
+    """
+    Return a {task_id: task document} dict for the given task IDs, fetched
+    with one task_list query per TASK_ID_FILTER_SIZE IDs.  IDs not visible
+    to the client are missing from the result.
+    """
+    task_ids = [str(task_id) for task_id in task_ids]
+    tasks = {}
+    for start in range(0, len(task_ids), TASK_ID_FILTER_SIZE):
+        ids = task_ids[start:start + TASK_ID_FILTER_SIZE]
+        response = tc.task_list(
+            limit=len(ids),
+            filter="task_id:{}/type:TRANSFER,DELETE".format(",".join(ids)),
+        )
+        for task in response:
+            tasks[task["task_id"]] = task
+    return tasks
+
+def task_progress(task):
+    """ Fraction of a task's subtasks that have finished, or None if unknown. """
+    total = task.get("subtasks_total")
+    if not total:
+        return None
+    done = sum(
+        task.get(key) or 0
+        for key in (
+            "subtasks_succeeded",
+            "subtasks_failed",
+            "subtasks_canceled",
+            "subtasks_expired",
+            "subtasks_skipped_errors",
+        )
+    )
+    return min(done / total, 1.0)
+
+class AdaptivePollInterval:
+    """
+    Per-task polling interval that follows the task's observed progress
+    rate: a task expected to finish soon is polled again after about half
+    its estimated remaining time, while a task making no visible progress
+    is polled less and less often, up to max_interval.
+    """
+
+    BACKOFF = 1.5
+
+    def __init__(self, min_interval, max_interval):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval = min_interval
+        self.last = None
+
+    def update(self, task, now):
+        """ Record a new task document observed at time now and return the next interval. """
+        progress = task_progress(task)
+        if self.last is not None and progress is not None and self.last[1] is not None:
+            elapsed = now - self.last[0]
+            advanced = progress - self.last[1]
+            if advanced > 0 and elapsed > 0:
+                remaining = (1.0 - progress) * elapsed / advanced
+                self.interval = remaining / 2
+            else:
+                self.interval *= self.BACKOFF
+        elif self.last is not None:
+            self.interval *= self.BACKOFF
+        self.interval = max(self.min_interval, min(self.interval, self.max_interval))
+        self.last = (now, progress)
+        return self.interval
+
+def bulk_get_tasks(tc, task_ids, workers=8):
+    """
+    Look up many tasks at once.  Task documents are fetched with grouped
+    task_list queries (see task_list_by_id); any ID those queries do not
+    return falls back to a get_task call, made in parallel.  Returns a
+    {task_id: task document} dict in the order of task_ids, without the IDs
+    that could not be found (404) or belong to another namespace (403).
+    """
+    task_ids = list(dict.fromkeys(str(task_id) for task_id in task_ids))
+    tasks = task_list_by_id(tc, task_ids)
+
+    def get_task(task_id):
+        try:
+            return tc.get_task(task_id)
+        except GlobusAPIError as e:
+            # a task of another namespace or identity is forbidden rather than missing
+            if e.http_status in (403, 404):
+                return None
+            raise
+
+    missing = [task_id for task_id in task_ids if task_id not in tasks]
+    if missing:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for task_id, task in zip(missing, executor.map(get_task, missing)):
+                if task is not None:
+                    tasks[task_id] = task
+
+    return {task_id: tasks[task_id] for task_id in task_ids if task_id in tasks}
+
+def iter_successful_transfer_pages(tc, task_id, marker=None):
+    """
+    Yield (transfers, next_marker) for each page of a task's successful
+    transfers, starting at ``marker``.  next_marker is None on the last page;
+    otherwise passing it back in resumes the listing after that page.
+    """
+    while True:
+        response = tc.task_successful_transfers(task_id, marker=marker)
+        marker = response.get("next_marker")
+        yield response["DATA"], marker
+        if not marker:
+            return
+
+# largest page size accepted by task_event_list
+TASK_EVENT_PAGE_SIZE = 1000
+
+def iter_task_event_pages(tc, task_id, filter=None, max_results=None):
+    """
+    Yield (events, total) for each page of a task's events, newest first,
+    paging by offset until every event (or max_results events) has been
+    read.  total is the number of matching events reported by the first
+    response, or None if the service did not report it.  If the service
+    refuses an offset beyond its paging limit, the events read so far are
+    kept and a warning is logged; comparing the events read with total
+    tells the caller that the listing was cut short.
+    """
+    offset = 0
+    first_total = None
+    query_params = {"filter": filter} if filter else None
+    while max_results is None or offset < max_results:
+        limit = TASK_EVENT_PAGE_SIZE if max_results is None else min(TASK_EVENT_PAGE_SIZE, max_results - offset)
+        try:
+            response = tc.task_event_list(task_id, limit=limit, offset=offset, query_params=query_params)
+        except GlobusAPIError as e:
+            if offset and e.http_status == 400:
+                logger.warning(f"[iter_task_event_pages] Stopped after {offset} events: {e.message}")
+                return
+            raise
+        events = list(response)
+        total = response.get("total")
+        if offset == 0:
+            first_total = total
+        if events:
+            yield events, first_total
+        offset += len(events)
+        if len(events) < limit or (total is not None and offset >= total):
+            return
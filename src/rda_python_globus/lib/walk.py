@@ -0,0 +1,69 @@
+import collections
+import posixpath
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from globus_sdk import GlobusAPIError, NetworkError
+
+import logging
+logger = logging.getLogger(__name__)
+
+def list_directory(tc, endpoint, path=None, filter=None, need_dirs=True):
+    """
+    List one directory on an endpoint.  Returns a tuple (dirpath, entries,
+    subdirs) where dirpath is the absolute path reported by the endpoint,
+    entries are the items matching the filter pattern and subdirs are all
+    subdirectory items.  With a filter, a second 'type:dir' listing is needed
+    to find the subdirectories, unless need_dirs is False.
+    """
+    params = {"path": path} if path else {}
+    if filter:
+        response = tc.operation_ls(endpoint, filter=filter, **params)
+        entries = list(response)
+        if need_dirs:
+            subdirs = list(tc.operation_ls(endpoint, filter="type:dir", **params))
+        else:
+            subdirs = []
+    else:
+        response = tc.operation_ls(endpoint, **params)
+        entries = list(response)
+        subdirs = [entry for entry in entries if entry["type"] == "dir"]
+    return response["path"], entries, subdirs
+
+def walk_tree(tc, endpoint, path=None, max_depth=None, workers=8, filter=None, descend=None):
+    """
+    Walk a directory tree on an endpoint, listing directories concurrently
+    with at most ``workers`` operation_ls calls in flight.
+
+    Yields (dirpath, depth, entries) tuples as listings complete, so output
+    can be streamed before the walk finishes; the order is therefore not
+    the tree order.  ``filter`` is a server-side filter string (e.g.
+    'name:~*.nc') applied to the entries of every directory.  Directories
+    deeper than ``max_depth`` (the starting directory has depth 0) are not
+    listed, and ``descend(dirpath, entry, depth)`` may return False to prune
+    a subdirectory.  Directories that cannot be listed are logged and skipped.
+    """
+    todo = collections.deque([(path, 0)])
+    pending = {}
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        while todo or pending:
+            while todo and len(pending) < workers:
+                dirpath, depth = todo.popleft()
+                need_dirs = max_depth is None or depth < max_depth
+                future = executor.submit(list_directory, tc, endpoint, dirpath, filter, need_dirs)
+                pending[future] = (dirpath, depth)
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                dirpath, depth = pending.pop(future)
+                try:
+                    dirpath, entries, subdirs = future.result()
+                except (GlobusAPIError, NetworkError) as e:
+                    logger.warning(f"[walk_tree] Unable to list {dirpath} on {endpoint}: {e}")
+                    continue
+                if max_depth is None or depth < max_depth:
+                    for subdir in subdirs:
+                        child = posixpath.join(dirpath, subdir["name"]) + "/"
+                        if descend is None or descend(child, subdir, depth + 1):
+                            todo.append((child, depth + 1))
+                yield dirpath, depth, entries
@@ -1,11 +1,24 @@
+import posixpath
+
 import click
 
 from .lib import (
     common_options,
     endpoint_options,
     path_options,
-    print_table, 
+    format_options,
+    print_table,
+    print_records,
+    human_size,
     transfer_client,
+    walk_tree,
+    SubtreeSizeCache,
+    ListingCache,
+    CachingTransferClient,
+    DU_CACHE_FILE,
+    LS_CACHE_FILE,
+    LS_CACHE_TTL,
+    LS_CACHE_MAX_BYTES,
     TACC_GLOBUS_ENDPOINT
 )
 
@@ -22,13 +35,61 @@ logger = logging.getLogger(__name__)
     type=str,
     help="Filter pattern for file listing. See help for details.",
 )
+@click.option(
+    "--recursive",
+    "-r",
+    is_flag=True,
+    default=False,
+    help="List subdirectories recursively.  Directory listings are printed as they arrive.",
+)
+@click.option(
+    "--max-depth",
+    type=click.IntRange(min=0),
+    default=None,
+    help="With --recursive, do not descend more than this many levels below --path.",
+)
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    default=8,
+    show_default=True,
+    help="With --recursive, number of directories listed concurrently.",
+)
+@click.option(
+    "--cache/--no-cache",
+    default=False,
+    envvar="DSGLOBUS_LS_CACHE",
+    show_default=True,
+    help="Serve directory listings from a local cache, and store new listings in it.",
+)
+@click.option(
+    "--refresh",
+    is_flag=True,
+    default=False,
+    help="List every directory again and update the cache.  Implies --cache.",
+)
+@click.option(
+    "--cache-ttl",
+    type=click.IntRange(min=0),
+    default=LS_CACHE_TTL,
+    show_default=True,
+    help="Seconds a cached listing stays valid.",
+)
 @endpoint_options
 @path_options
+@format_options
 @common_options
 def ls_command(
     endpoint: str,
     path: str,
-    filter: str
+    filter: str,
+    recursive: bool,
+    max_depth: int,
+    workers: int,
+    cache: bool,
+    refresh: bool,
+    cache_ttl: int,
+    output_format: str
 ) -> None:
     """ 
     List the contents of a directory on an endpoint.  If no path is given, the root directory of the endpoint will be used.
@@ -58,6 +119,28 @@ def ls_command(
 	$ dsglobus ls -ep <endpoint> -p <path> --filter '=file2.txt'  # only "file2.txt"
 	$ dsglobus ls -ep <endpoint> -p <path> --filter 'file2.txt'  # same as '=file2.txt'
 	$ dsglobus ls -ep <endpoint> -p <path> --filter '!=file2.txt'  # anything but "file2.txt"
+
+    \b
+    === Recursive listing ===
+
+    --recursive walks the directory tree below --path, listing up to --workers
+    directories at a time.  Each directory is printed as soon as its listing
+    arrives, so directories appear in completion order.  --filter is applied to
+    the entries of every directory.
+
+    \b
+	$ dsglobus ls -ep <endpoint> -p <path> --recursive --max-depth 2 --filter '~*.nc'
+
+    \b
+    === Listing cache ===
+
+    --cache keeps directory listings in a local SQLite file (~/.cache/dsglobus),
+    keyed by endpoint, path and filter, so repeated listings of mostly static
+    directories are answered without calling the endpoint.  Listings expire
+    after --cache-ttl seconds and the least recently used ones are evicted when
+    the cache grows past its size limit.  --refresh lists every directory again.
+    Cache hits and misses are reported on stderr.  Set DSGLOBUS_LS_CACHE=1 to
+    enable the cache by default.
     """
 
     ls_params = {}
@@ -85,6 +168,191 @@ def ls_command(
     else:
         tc = transfer_client()
 
+    listing_cache = None
+    if cache or refresh:
+        listing_cache = ListingCache(LS_CACHE_FILE, ttl=cache_ttl, max_bytes=LS_CACHE_MAX_BYTES)
+        tc = CachingTransferClient(tc, listing_cache, refresh=refresh)
+    try:
+        _list(tc, endpoint, path, ls_params, fields, recursive, max_depth, workers, output_format)
+    finally:
+        if listing_cache is not None:
+            listing_cache.close()
+            click.echo(f"Listing cache: {listing_cache.hits} hits, {listing_cache.misses} misses", err=True)
+
+def _list(tc, endpoint, path, ls_params, fields, recursive, max_depth, workers, output_format):
+    if recursive:
+        walk = walk_tree(
+            tc,
+            endpoint,
+            path=path,
+            max_depth=max_depth,
+            workers=workers,
+            filter=ls_params.get("filter"),
+        )
+        if output_format == "table":
+            for dirpath, depth, entries in walk:
+                click.echo(f"{dirpath}:")
+                print_table(entries, fields)
+                click.echo("")
+        else:
+            entries = (
+                dict(entry, directory=dirpath)
+                for dirpath, depth, dir_entries in walk
+                for entry in dir_entries
+            )
+            print_records(entries, [("Directory", "directory")] + fields, output_format)
+        return
+
     ls_response = tc.operation_ls(endpoint, **ls_params)
-    print_table(ls_response, fields)
-	
\ No newline at end of file
+    print_records(ls_response, fields, output_format)
+	
+def disk_usage(tc, endpoint, path=None, max_depth=0, workers=8, cache=None):
+    """
+    Total the file counts and bytes of a directory tree on an endpoint.
+
+    Directories are listed in parallel with walk_tree.  Below ``max_depth``,
+    a subdirectory whose (path, mtime) is found in ``cache`` is not listed;
+    its cached totals for the whole subtree are used instead.  Only that
+    directory's own mtime is checked, so changes further down the subtree
+    are missed until the directory itself changes.  Returns a dict mapping directory
+    path to (depth, files, bytes) for every directory up to ``max_depth``.
+    The cache is updated with the totals of every fully listed directory.
+    """
+    mtimes = {}
+    cached = {}
+    direct = {}
+    children = {}
+    depths = {}
+
+    def descend(child, entry, depth):
+        mtimes[child] = entry["last_modified"]
+        if cache is not None and depth > max_depth:
+            hit = cache.get(endpoint, child, entry["last_modified"])
+            if hit is not None:
+                cached[child] = hit
+                return False
+        return True
+
+    for dirpath, depth, entries in walk_tree(tc, endpoint, path=path, workers=workers, descend=descend):
+        files = [entry for entry in entries if entry["type"] != "dir"]
+        direct[dirpath] = (len(files), sum(entry["size"] or 0 for entry in files))
+        children[dirpath] = [
+            posixpath.join(dirpath, entry["name"]) + "/" for entry in entries if entry["type"] == "dir"
+        ]
+        depths[dirpath] = depth
+
+    # aggregate bottom up; a subtree that could not be listed makes its
+    # ancestors incomplete, and incomplete totals are not cached
+    totals = dict(cached)
+    incomplete = set()
+    for dirpath in sorted(direct, key=lambda d: depths[d], reverse=True):
+        files, nbytes = direct[dirpath]
+        for child in children[dirpath]:
+            if child in totals:
+                files += totals[child][0]
+                nbytes += totals[child][1]
+            if child not in totals or child in incomplete:
+                incomplete.add(dirpath)
+        totals[dirpath] = (files, nbytes)
+        if cache is not None and dirpath in mtimes and dirpath not in incomplete:
+            cache.put(endpoint, dirpath, mtimes[dirpath], files, nbytes)
+
+    for dirpath in incomplete:
+        logger.warning(f"[disk_usage] Totals for {dirpath} are incomplete; some subdirectories could not be listed.")
+
+    return {
+        dirpath: (depths[dirpath], *totals[dirpath])
+        for dirpath in direct
+        if depths[dirpath] <= max_depth
+    }
+
+@click.command(
+    "du",
+    short_help="Summarize file counts and sizes of a directory tree on an endpoint",
+)
+@click.option(
+    "--max-depth",
+    "-d",
+    type=click.IntRange(min=0),
+    default=0,
+    show_default=True,
+    help="Print totals for directories up to this many levels below --path.",
+)
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    default=8,
+    show_default=True,
+    help="Number of directories listed concurrently.",
+)
+@click.option(
+    "--human-readable",
+    "-H",
+    is_flag=True,
+    default=False,
+    help="Print sizes in powers of 1024 (e.g. 1.5G).",
+)
+@click.option(
+    "--cache/--no-cache",
+    default=False,
+    show_default=True,
+    help=(
+        "Reuse subtree totals cached by earlier runs. Only the top directory of a cached "
+        "subtree is checked for changes, so files added or removed deeper down are missed."
+    ),
+)
+@endpoint_options
+@path_options
+@format_options
+@common_options
+def du_command(
+    endpoint: str,
+    path: str,
+    max_depth: int,
+    workers: int,
+    human_readable: bool,
+    cache: bool,
+    output_format: str
+) -> None:
+    """
+    Recursively total the number of files and bytes below a directory on an
+    endpoint.  If no path is given, the root directory of the endpoint will be used.
+
+    \b
+    With --cache, the subtree totals of every directory are saved locally,
+    keyed by endpoint, path and directory modification time.  On later runs,
+    a directory deeper than --max-depth whose own modification time has not
+    changed is not listed again, and its cached totals are reused for its
+    whole subtree.  A directory's modification time only changes when
+    entries are added to or removed from that directory itself, so files
+    added, removed or rewritten in its subdirectories are NOT detected.  Use
+    --cache only for trees that change at the top level, such as archives
+    where whole dataset directories are added, or run without --cache to
+    get exact totals.
+
+    \b
+	$ dsglobus du -ep gdex-quasar -p /d999009 --max-depth 1 -H --cache
+    """
+    if endpoint == TACC_GLOBUS_ENDPOINT:
+        tc = transfer_client(namespace="tacc")
+    else:
+        tc = transfer_client()
+
+    size_cache = SubtreeSizeCache(DU_CACHE_FILE) if cache else None
+    usage = disk_usage(tc, endpoint, path=path, max_depth=max_depth, workers=workers, cache=size_cache)
+    if size_cache is not None:
+        size_cache.save()
+
+    def format_size(row):
+        return human_size(row[3]) if human_readable else row[3]
+
+    fields = [
+        ("Files", lambda row: row[2]),
+        ("Size", format_size),
+        ("Directory", lambda row: row[0]),
+    ]
+    print_records(
+        ((dirpath, *usage[dirpath]) for dirpath in sorted(usage)),
+        fields,
+        output_format,
+    )
@@ -1,24 +1,74 @@
+import importlib
+
 import click
-import logging
-import logging.handlers
 
-from . import transfer, list, task_management, file_management
 from .lib import common_options, configure_log
 
-logger = logging.getLogger(__name__)
-configure_log()
+# subcommand name: (module, command attribute, short help).  A module is only
+# imported when its command is run (or asked for its own --help), so
+# 'dsglobus --help' does not load globus_sdk.  Keep the help text in sync
+# with the command's own short help.
+LAZY_COMMANDS = {
+    "transfer": (".transfer", "transfer_command", "Submit a Globus transfer task."),
+    "ls": (".list", "ls_command", "List files on an endpoint"),
+    "du": (".list", "du_command", "Summarize file counts and sizes of a directory tree on an endpoint"),
+    "get-task": (".task_management", "get_task", "Show information about one or more Globus tasks."),
+    "task-list": (".task_management", "task_list", "List Globus tasks."),
+    "task-event-list": (".task_management", "task_event_list", "List events and show details about a Globus task."),
+    "cancel-task": (".task_management", "cancel_task", "Cancel a Globus task."),
+    "task-wait": (".task_management", "task_wait", "Wait for one or more Globus tasks to finish."),
+    "task-watch": (".task_management", "task_watch", "Show live throughput of one or more Globus tasks."),
+    "task-successful-transfers": (
+        ".task_management",
+        "task_successful_transfers",
+        "Export the files successfully transferred by a Globus task.",
+    ),
+    "mkdir": (".file_management", "mkdir_command", "Create a directory on a Globus endpoint."),
+    "rename": (".file_management", "rename_command", "Rename a file or directory on a Globus endpoint."),
+    "delete": (".file_management", "delete_command", "Delete files and/or directories on a Globus endpoint."),
+}
+
+class LazyGroup(click.Group):
+    """
+    Click group whose subcommands are imported on first use.  The command
+    list in --help is built from the static short help in lazy_commands.
+    """
+
+    def __init__(self, *args, lazy_commands=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lazy_commands = lazy_commands or {}
 
-@click.group("dsglobus")
+    def list_commands(self, ctx):
+        return sorted(set(super().list_commands(ctx)) | set(self.lazy_commands))
+
+    def get_command(self, ctx, cmd_name):
+        if cmd_name in self.lazy_commands and cmd_name not in self.commands:
+            module_name, attr, _ = self.lazy_commands[cmd_name]
+            module = importlib.import_module(module_name, __package__)
+            self.add_command(getattr(module, attr), cmd_name)
+        return super().get_command(ctx, cmd_name)
+
+    def format_commands(self, ctx, formatter):
+        limit = formatter.width - 6 - max(len(name) for name in self.list_commands(ctx))
+        rows = []
+        for name in self.list_commands(ctx):
+            if name in self.commands:
+                command = self.commands[name]
+                if command.hidden:
+                    continue
+                rows.append((name, command.get_short_help_str(limit)))
+            else:
+                rows.append((name, self.lazy_commands[name][2]))
+        if rows:
+            with formatter.section("Commands"):
+                formatter.write_dl(rows)
+
+@click.group("dsglobus", cls=LazyGroup, lazy_commands=LAZY_COMMANDS)
 @common_options
 def cli():
-    """ 
-    DSGLOBUS: A command-line tool for Globus data transfer and management of files 
+    """
+    DSGLOBUS: A command-line tool for Globus data transfer and management of files
     archived in the NSF NCAR Research Data Archive.
     """
-    pass
-
-# cli workflow
-cli.add_command(transfer.transfer_command)
-cli.add_command(list.ls_command)
-task_management.add_commands(cli)
-file_management.add_commands(cli)
+    # only runs when a subcommand is invoked, not for --help
+    configure_log()
@@ -1,6 +1,14 @@
 import click
+import csv
+import json
+import os
+import tempfile
 import uuid
-from typing import Sequence, Union
+import sys
+import time
+import heapq
+import itertools
+from typing import Sequence, TextIO, Union
 import collections.abc
 import datetime
 from globus_sdk import GlobusAPIError, NetworkError
@@ -8,9 +16,26 @@ from globus_sdk import GlobusAPIError, NetworkError
 from .lib import (
     common_options,
     namespace_options,
+    multi_namespace_options,
+    format_options,
     transfer_client,
     colon_formatted_print,
+    print_records,
+    iter_task_pages,
+    prefetch,
+    bulk_get_tasks,
+    iter_manifest,
+    AdaptivePollInterval,
+    TERMINAL_STATUSES,
+    task_progress,
+    human_size,
     print_table,
+    iter_successful_transfer_pages,
+    iter_records,
+    record_keys,
+    write_ndjson,
+    iter_task_event_pages,
+    EventSummary,
 )
 
 import logging
@@ -46,6 +71,37 @@ TRANSFER_FIELDS = [
     ("Verify Checksum", "verify_checksum"),
 ]
 
+EVENT_FIELDS = [
+    ("Time", "time"),
+    ("Code", "code"),
+    ("Is Error", "is_error"),
+    ("Description", "description"),
+    ("Details", "details"),
+]
+
+EVENT_CODE_SUMMARY_FIELDS = [
+    ("Code", "code"),
+    ("Count", "count"),
+    ("First", "first_time"),
+    ("Last", "last_time"),
+]
+
+EVENT_SIGNATURE_SUMMARY_FIELDS = EVENT_CODE_SUMMARY_FIELDS + [
+    ("Signature", "signature"),
+    ("Top Paths", "top_paths"),
+    ("Events Read", "events_read"),
+    ("Events Total", "events_total"),
+    ("Truncated", "truncated"),
+]
+
+# task-wait exit statuses
+TASK_WAIT_SUCCEEDED = 0
+TASK_WAIT_FAILED = 1
+TASK_WAIT_TIMEOUT = 124
+
+# task-watch exit status when stopped with Ctrl+C (128 + SIGINT)
+TASK_WATCH_INTERRUPTED = 130
+
 SUCCESSFUL_TRANSFER_FIELDS = [
     ("Source Path", "source_path"),
     ("Destination Path", "destination_path"),
@@ -73,39 +129,73 @@ def _process_filterval(
         return f"{prefix}:{value}"
     return f"{prefix}:{','.join(str(x) for x in value)}"
 
+def _task_fields(task_info):
+    """ Fields shown for a task, depending on its type and completion state. """
+    return (
+        COMMON_FIELDS
+        + (COMPLETED_FIELDS if task_info["completion_time"] else ACTIVE_FIELDS)
+        + (DELETE_FIELDS if task_info["type"] == "DELETE" else TRANSFER_FIELDS)
+    )
+
 @click.command(
-    short_help="Show information about a Globus task.",
+    short_help="Show information about one or more Globus tasks.",
 )
 @click.argument(
-    "task-id",
+    "task-ids",
     type=click.UUID,
+    nargs=-1,
+)
+@click.option(
+    "--batch",
+    type=click.File('r'),
+    help="Read task IDs from a file, one per line (or a JSON array).  Use '-' to read from stdin.",
 )
 @namespace_options
+@format_options
 @common_options
-def get_task(task_id: uuid.UUID, namespace: str) -> None:
+def get_task(task_ids: Sequence[uuid.UUID], batch: Union[TextIO, None], namespace: str, output_format: str) -> None:
     """ 
-    Print information including status about a Globus task.  The task may
-    be pending, completed, failed, or in progress.
+    Print information including status about one or more Globus tasks.  The
+    tasks may be pending, completed, failed, or in progress.
+
+    \b
+    Several tasks are looked up with grouped task_list queries (50 IDs per
+    query) rather than one request per task.
     """
-    if not task_id:
-        raise click.UsageError("TASK_ID is required.")
+    task_ids = [str(task_id) for task_id in task_ids]
+    if batch:
+        for entry in iter_manifest(batch, ("task_id",)):
+            try:
+                task_ids.append(str(uuid.UUID(entry["task_id"])))
+            except ValueError:
+                raise click.BadParameter(f"Invalid task ID: {entry['task_id']}", param_hint="'--batch'")
+    if not task_ids:
+        raise click.UsageError("TASK_ID or --batch is required.")
 
     tc = transfer_client(namespace=namespace)
     try:
-        task_info = tc.get_task(task_id)
+        if len(task_ids) == 1:
+            tasks = {task_ids[0]: tc.get_task(task_ids[0])}
+        else:
+            tasks = bulk_get_tasks(tc, task_ids)
     except (GlobusAPIError, NetworkError) as e:
         logger.error(f"Error: {e}")
         click.echo("Failed to get task details.")
-    if not task_info:
+        return
+    if not tasks:
         click.echo("No task information available.")
         return
 
-    fields=(
-            COMMON_FIELDS
-            + (COMPLETED_FIELDS if task_info["completion_time"] else ACTIVE_FIELDS)
-            + (DELETE_FIELDS if task_info["type"] == "DELETE" else TRANSFER_FIELDS)
-    )
-    colon_formatted_print(task_info, fields)
+    if output_format == "table":
+        for task_info in tasks.values():
+            colon_formatted_print(task_info, _task_fields(task_info))
+    else:
+        print_records(tasks.values(), COMMON_FIELDS + ACTIVE_FIELDS + COMPLETED_FIELDS + TRANSFER_FIELDS, output_format)
+
+    missing = [task_id for task_id in dict.fromkeys(task_ids) if task_id not in tasks]
+    if missing:
+        click.echo(f"Task(s) not found: {', '.join(missing)}", err=True)
+        sys.exit(1)
 
 @click.command(
     short_help="List Globus tasks."
@@ -116,7 +206,20 @@ def get_task(task_id: uuid.UUID, namespace: str) -> None:
     type=int,
     default=10,
     show_default=True,
-    help="Limit the number of results returned.",
+    help="Limit the number of results returned.  Ignored with --all or --max-results.",
+)
+@click.option(
+    "--all",
+    "all_tasks",
+    is_flag=True,
+    default=False,
+    help="Page through every matching task, not just the first --limit results.",
+)
+@click.option(
+    "--max-results",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Page through matching tasks until this many have been listed.",
 )
 @click.option(
     "--filter-task-id",
@@ -161,10 +264,13 @@ def get_task(task_id: uuid.UUID, namespace: str) -> None:
     callback=_format_date_callback,
     help="Filter tasks completed after this date.",
 )
-@namespace_options
+@multi_namespace_options
+@format_options
 @common_options
 def task_list(
     limit: int,
+    all_tasks: bool,
+    max_results: Union[int, None],
     filter_task_id: Union[str, None],
     filter_status: Union[str, None],
     filter_type: Union[str, None],
@@ -172,10 +278,21 @@ def task_list(
     filter_requested_after: Union[str, None],
     filter_completed_before: Union[str, None],
     filter_completed_after: Union[str, None],
-    namespace: str
+    namespaces: Sequence[str],
+    output_format: str
 ) -> None:
     """ 
     List the most recent Globus tasks with optional filtering.
+
+    \b
+    With --all or --max-results, results are paged through beyond the 1000
+    task limit of a single query.  The next page is fetched while the
+    current one is printed, and rows are streamed out as they arrive.
+
+    \b
+    With --namespace all (or a comma-separated list of namespaces), each
+    namespace is queried concurrently with its own client and the results
+    are merged newest first, with a Namespace column added.
     """    
     filter_parts = [
         _process_filterval("task_id", filter_task_id),
@@ -183,14 +300,17 @@ def task_list(
         _process_filterval("type", filter_type, default="type:TRANSFER,DELETE"),
     ]
 
-    filter_parts.extend(
-        [
-            _process_filterval("request_time", [filter_requested_after, filter_requested_before]),
-            _process_filterval("completion_time", [filter_completed_after, filter_completed_before]),
-        ]
+    filter_parts.append(
+        _process_filterval("completion_time", [filter_completed_after, filter_completed_before]),
     )
 
-    filter_string = "/".join(p for p in filter_parts if p is not None)
+    # the request_time window is managed by iter_task_pages when paging
+    base_filter = "/".join(p for p in filter_parts if p is not None)
+    filter_string = "/".join(
+        p for p in filter_parts + [
+            _process_filterval("request_time", [filter_requested_after, filter_requested_before])
+        ] if p is not None
+    )
 
     fields = [
         ("Task ID", "task_id"),
@@ -203,16 +323,47 @@ def task_list(
         ("Label", "label")
     ]
 
-    tc = transfer_client(namespace=namespace)
+    paging = all_tasks or max_results
+
+    def namespace_tasks(namespace):
+        """ Stream the matching tasks of one namespace, fetched on a background thread. """
+        tc = transfer_client(namespace=namespace)
+        if paging:
+            pages = iter_task_pages(
+                tc,
+                base_filter,
+                requested_after=filter_requested_after,
+                requested_before=filter_requested_before,
+            )
+        else:
+            def first_page():
+                yield tc.task_list(limit=limit, filter=filter_string, orderby="request_time DESC")
+            pages = first_page()
+        return itertools.chain.from_iterable(prefetch(pages))
+
+    def tagged(namespace, tasks):
+        for task in tasks:
+            yield dict(task, namespace=namespace)
+
+    if len(namespaces) == 1:
+        tasks = namespace_tasks(namespaces[0])
+    else:
+        # query every namespace concurrently and merge the newest-first streams
+        fields = [("Namespace", "namespace")] + fields
+        tasks = heapq.merge(
+            *[tagged(ns, namespace_tasks(ns)) for ns in namespaces],
+            key=lambda task: task["request_time"],
+            reverse=True,
+        )
+
     try:
-        tasks = tc.task_list(limit=limit, filter=filter_string, orderby="request_time DESC")
+        print_records(itertools.islice(tasks, max_results if paging else limit), fields, output_format)
     except (GlobusAPIError, NetworkError) as e:
         logger.error(f"Error: {e}")
         click.echo("Failed to get tasks.")
 
-    print_table(tasks, fields)
-
 @click.command(
+    short_help="List events and show details about a Globus task.",
     help="List events and show details about a Globus task, including faults and error messages.",
 )
 @click.argument(
@@ -240,27 +391,120 @@ def task_list(
     is_flag=True,
     help="Only show events with error codes.",
 )
+@click.option(
+    "--summary",
+    "-S",
+    is_flag=True,
+    help="Read all events and summarize them by code and by error signature instead of listing them.",
+)
+@click.option(
+    "--top",
+    type=click.IntRange(min=1),
+    default=10,
+    show_default=True,
+    help="Number of most frequent paths shown with --summary.",
+)
 @namespace_options
+@format_options
 @common_options
-def task_event_list(task_id: uuid.UUID, limit: int, offset: int, error_only: bool, namespace: str) -> None:
+def task_event_list(
+    task_id: uuid.UUID,
+    limit: int,
+    offset: int,
+    error_only: bool,
+    summary: bool,
+    top: int,
+    namespace: str,
+    output_format: str
+) -> None:
     """ 
     List the events associated with a Globus task.  This includes status
     updates, error messages, and other information about the task's progress.
+
+    \b
+    With --summary, every event of the task (or the first --limit events)
+    is read and aggregated as the pages arrive.  Events are grouped by code
+    and by error signature, which is the description and details with file
+    paths, UUIDs, hosts and numbers (except status codes) taken out, so the
+    same fault on many files is counted once.  Each group shows its count
+    and first and last times, followed by the paths named in the most
+    events.  Machine readable formats output the signature groups.  The
+    Transfer API stops paging task events after a limit; if it is reached,
+    the summary header gives the events read out of the task's total, and
+    the machine readable records set truncated to true.
     """
     if not task_id:
         raise click.UsageError("TASK_ID is required.")
+    if summary and offset:
+        raise click.UsageError("--offset cannot be used with --summary.")
     
     filters = {"filter": "is_error:1"} if error_only else None
     
     tc = transfer_client(namespace=namespace)
     try:
-        for event in tc.task_event_list(task_id, limit=limit, offset=offset, query_params=filters):
+        if summary:
+            event_summary = EventSummary()
+            pages = iter_task_event_pages(tc, task_id, filter="is_error:1" if error_only else None, max_results=limit)
+            for page, total in prefetch(pages):
+                event_summary.available = total
+                for event in page:
+                    event_summary.add(event)
+            print_event_summary(task_id, event_summary, top, output_format, max_results=limit)
+            return
+        events = tc.task_event_list(task_id, limit=limit, offset=offset, query_params=filters)
+        if output_format != "table":
+            print_records(events, EVENT_FIELDS, output_format)
+            return
+        for event in events:
             print(f"Event on Task({task_id}) at {event['time']}:\n{event['code']}\n{event['description']}\n{event['details']}\n")
     except (GlobusAPIError, NetworkError) as e:
         logger.error(f"Error: {e}")
         click.echo("Failed to get task events.")
         return
 
+def print_event_summary(task_id, event_summary, top, output_format, max_results=None):
+    """
+    Print an EventSummary as tables, or its signature groups in a
+    machine-readable format.  If the events read fall short of the task's
+    total (up to max_results), the output says the summary is partial.
+    """
+    truncated = event_summary.truncated(max_results)
+    if output_format != "table":
+        groups = (
+            dict(
+                group,
+                events_read=event_summary.total,
+                events_total=event_summary.available,
+                truncated=truncated,
+            )
+            for group in event_summary.by_signature(top=top)
+        )
+        print_records(groups, EVENT_SIGNATURE_SUMMARY_FIELDS, output_format)
+        return
+
+    if truncated:
+        click.echo(
+            f"Summary of {event_summary.total} of {event_summary.available} events on Task({task_id}) "
+            "(API paging limit reached)\n"
+        )
+    else:
+        click.echo(f"Summary of {event_summary.total} events on Task({task_id})\n")
+    if not event_summary.total:
+        return
+    click.echo("Events by code:")
+    print_table(event_summary.by_code(), EVENT_CODE_SUMMARY_FIELDS)
+    click.echo("\nEvents by signature:")
+    print_table(
+        event_summary.by_signature(top=1),
+        EVENT_CODE_SUMMARY_FIELDS + [
+            ("Example Path", lambda group: group["top_paths"][0] if group["top_paths"] else ""),
+            ("Signature", "signature"),
+        ],
+    )
+    if event_summary.paths:
+        click.echo(f"\nTop {top} paths:")
+        print_table(event_summary.top_paths(top), [("Events", "count"), ("Path", "path")])
+
 @click.command(
     help="Cancel a Globus task.",
 )
@@ -286,9 +530,415 @@ def cancel_task(task_id: uuid.UUID, namespace: str) -> None:
         logger.error(f"Error: {e}")
         click.echo("Failed to cancel task.")
 
+@click.command(
+    "task-wait",
+    short_help="Wait for one or more Globus tasks to finish.",
+)
+@click.argument(
+    "task-ids",
+    type=click.UUID,
+    nargs=-1,
+    required=True,
+)
+@click.option(
+    "--timeout",
+    type=click.FloatRange(min=0),
+    default=None,
+    help="Give up after this many seconds.  Waits indefinitely by default.",
+)
+@click.option(
+    "--any/--all",
+    "wait_any",
+    default=False,
+    show_default=True,
+    help="Return as soon as any task finishes, or only once all tasks have finished.",
+)
+@click.option(
+    "--min-interval",
+    type=click.FloatRange(min=0.1),
+    default=2.0,
+    show_default=True,
+    help="Shortest time between polls, in seconds.",
+)
+@click.option(
+    "--max-interval",
+    type=click.FloatRange(min=0.1),
+    default=120.0,
+    show_default=True,
+    help="Longest time between polls, in seconds.",
+)
+@namespace_options
+@common_options
+def task_wait(
+    task_ids: Sequence[uuid.UUID],
+    timeout: Union[float, None],
+    wait_any: bool,
+    min_interval: float,
+    max_interval: float,
+    namespace: str
+) -> None:
+    """
+    Block until the given Globus tasks finish.  All tasks are polled with a
+    single task_list query per poll.  The time to the next poll adapts to
+    each task's observed progress rate: tasks close to completion are
+    polled sooner, and tasks that are not advancing are polled less often.
+
+    \b
+    Exit status:
+      0    all tasks (or, with --any, the first finished task) succeeded
+      1    a task failed
+      124  the timeout expired first
+    """
+    tc = transfer_client(namespace=namespace)
+    task_ids = list(dict.fromkeys(str(task_id) for task_id in task_ids))
+    intervals = {task_id: AdaptivePollInterval(min_interval, max(min_interval, max_interval)) for task_id in task_ids}
+    pending = set(task_ids)
+    statuses = {}
+    start = time.monotonic()
+
+    while True:
+        try:
+            tasks = bulk_get_tasks(tc, pending)
+        except (GlobusAPIError, NetworkError) as e:
+            # transient failures are retried at the next poll
+            logger.warning(f"Error polling tasks: {e}")
+            tasks = {}
+        else:
+            missing = pending - set(tasks)
+            if missing and not statuses:
+                raise click.BadParameter(f"Task(s) not found: {', '.join(sorted(missing))}", param_hint="TASK_IDS")
+
+        now = time.monotonic()
+        for task_id, task in tasks.items():
+            intervals[task_id].update(task, now)
+            if task["status"] in TERMINAL_STATUSES:
+                pending.discard(task_id)
+                statuses[task_id] = task["status"]
+                click.echo(f"Task {task_id} {task['status']}")
+
+        if not pending or (wait_any and statuses):
+            break
+
+        wait = min(intervals[task_id].interval for task_id in pending)
+        if timeout is not None:
+            remaining = timeout - (time.monotonic() - start)
+            if remaining <= 0:
+                click.echo(f"Timed out waiting for {len(pending)} task(s): {', '.join(sorted(pending))}")
+                sys.exit(TASK_WAIT_TIMEOUT)
+            wait = min(wait, remaining)
+        time.sleep(wait)
+
+    if any(status != "SUCCEEDED" for status in statuses.values()):
+        sys.exit(TASK_WAIT_FAILED)
+    sys.exit(TASK_WAIT_SUCCEEDED)
+
+def _format_duration(seconds):
+    if seconds is None:
+        return "-"
+    hours, remainder = divmod(int(seconds), 3600)
+    minutes, seconds = divmod(remainder, 60)
+    return f"{hours:d}:{minutes:02d}:{seconds:02d}"
+
+@click.command(
+    "task-watch",
+    short_help="Show live throughput of one or more Globus tasks.",
+)
+@click.argument(
+    "task-ids",
+    type=click.UUID,
+    nargs=-1,
+    required=True,
+)
+@click.option(
+    "--interval",
+    "-i",
+    type=click.FloatRange(min=1),
+    default=10.0,
+    show_default=True,
+    help="Seconds between refreshes.",
+)
+@click.option(
+    "--stall-after",
+    type=click.IntRange(min=1),
+    default=3,
+    show_default=True,
+    help="Flag an active task as STALLED after this many refreshes without new bytes transferred.",
+)
+@namespace_options
+@common_options
+def task_watch(task_ids: Sequence[uuid.UUID], interval: float, stall_after: int, namespace: str) -> None:
+    """
+    Show a live view of bytes transferred, current and average transfer
+    rates and estimated time remaining for several Globus tasks, plus their
+    total throughput.  All tasks are refreshed with one batched task_list
+    query per interval, and on a terminal the view is redrawn in place.
+    Exits once every task has finished, or on Ctrl+C.  Task IDs that are
+    not found in the namespace are reported as an error before watching
+    starts.
+
+    \b
+    Rate is measured between refreshes, Avg Rate is the task's effective
+    bytes per second, and ETA is extrapolated from the task's subtask
+    progress since watching started.
+
+    \b
+    Exit status:
+      0    every task finished
+      130  stopped with Ctrl+C
+    """
+    tc = transfer_client(namespace=namespace)
+    task_ids = list(dict.fromkeys(str(task_id) for task_id in task_ids))
+    redraw = sys.stdout.isatty()
+    first_seen = {}
+    last_seen = {}
+    unchanged = {}
+    lines = 0
+
+    fields = [
+        ("Task ID", "task_id"),
+        ("Status", "status"),
+        ("Done", "done"),
+        ("Bytes", "bytes"),
+        ("Rate", "rate"),
+        ("Avg Rate", "avg_rate"),
+        ("ETA", "eta"),
+        ("Note", "note"),
+    ]
+
+    try:
+        while True:
+            try:
+                tasks = bulk_get_tasks(tc, task_ids)
+            except (GlobusAPIError, NetworkError) as e:
+                logger.warning(f"Error refreshing tasks: {e}")
+                time.sleep(interval)
+                continue
+
+            missing = [task_id for task_id in task_ids if task_id not in tasks]
+            if missing and not first_seen:
+                raise click.BadParameter(f"Task(s) not found: {', '.join(missing)}", param_hint="TASK_IDS")
+
+            now = time.monotonic()
+            rows = []
+            total_bytes = 0
+            total_rate = 0.0
+            etas = []
+            for task_id in task_ids:
+                task = tasks.get(task_id)
+                if task is None:
+                    rows.append({"task_id": task_id, "status": "NOT FOUND", "done": "-", "bytes": "-",
+                                 "rate": "-", "avg_rate": "-", "eta": "-", "note": ""})
+                    continue
+
+                nbytes = task.get("bytes_transferred") or 0
+                progress = task_progress(task)
+                finished = task["status"] in TERMINAL_STATUSES
+                start_time, start_progress = first_seen.setdefault(task_id, (now, progress))
+
+                rate = 0.0
+                if task_id in last_seen and now > last_seen[task_id][0]:
+                    rate = max(nbytes - last_seen[task_id][1], 0) / (now - last_seen[task_id][0])
+                    unchanged[task_id] = 0 if nbytes > last_seen[task_id][1] else unchanged.get(task_id, 0) + 1
+                last_seen[task_id] = (now, nbytes)
+
+                eta = None
+                if finished:
+                    eta = 0
+                elif progress is not None and start_progress is not None and progress > start_progress:
+                    eta = (1.0 - progress) * (now - start_time) / (progress - start_progress)
+                    etas.append(eta)
+
+                note = task.get("nice_status") or ""
+                if not finished and unchanged.get(task_id, 0) >= stall_after:
+                    note = "STALLED"
+
+                total_bytes += nbytes
+                total_rate += 0.0 if finished else rate
+                rows.append({
+                    "task_id": task_id,
+                    "status": task["status"],
+                    "done": "-" if progress is None else f"{progress:.0%}",
+                    "bytes": human_size(nbytes),
+                    "rate": f"{human_size(rate)}/s",
+                    "avg_rate": f"{human_size(task.get('effective_bytes_per_second') or 0)}/s",
+                    "eta": _format_duration(eta),
+                    "note": note,
+                })
+
+            active = sum(1 for task in tasks.values() if task["status"] not in TERMINAL_STATUSES)
+            if redraw and lines:
+                # move the cursor back to the top of the previous frame and clear it
+                sys.stdout.write(f"\x1b[{lines}F\x1b[J")
+            elif lines:
+                click.echo("")
+            print_table(rows, fields)
+            click.echo(
+                f"Total: {human_size(total_bytes)} transferred at {human_size(total_rate)}/s, "
+                f"ETA {_format_duration(max(etas) if etas else None)}, "
+                f"{active} of {len(task_ids)} tasks active, updated {time.strftime('%H:%M:%S')}"
+            )
+            sys.stdout.flush()
+            lines = len(rows) + 3
+
+            if active == 0 and len(tasks) == len(task_ids):
+                break
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        sys.exit(TASK_WATCH_INTERRUPTED)
+
+def _load_checkpoint(path, task_id):
+    """ Read a task-successful-transfers checkpoint file, or return None if there is none. """
+    try:
+        with open(path) as f:
+            state = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        raise click.BadParameter(f"Unable to read checkpoint file {path}: {e}", param_hint="'--checkpoint'")
+    if state.get("task_id") != task_id:
+        raise click.BadParameter(
+            f"Checkpoint file {path} belongs to task {state.get('task_id')}, not {task_id}",
+            param_hint="'--checkpoint'",
+        )
+    return state
+
+def _save_checkpoint(path, state):
+    """ Atomically replace a checkpoint file. """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".checkpoint")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp, path)
+    except OSError:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+@click.command(
+    "task-successful-transfers",
+    short_help="Export the files successfully transferred by a Globus task.",
+)
+@click.argument(
+    "task-id",
+    type=click.UUID,
+)
+@click.option(
+    "--output",
+    "-o",
+    type=click.Path(dir_okay=False, writable=True, allow_dash=True),
+    default="-",
+    show_default=True,
+    help="File to write the records to.  Defaults to standard output.",
+)
+@click.option(
+    "--format",
+    "-F",
+    "output_format",
+    type=click.Choice(["ndjson", "csv"], case_sensitive=False),
+    default="ndjson",
+    show_default=True,
+    help="Output format.",
+)
+@click.option(
+    "--checkpoint",
+    type=click.Path(dir_okay=False, writable=True),
+    default=None,
+    help="JSON file recording the paging marker after each page is written.  If the file exists, " \
+         "the export resumes where it stopped.  The file is removed once the export completes.",
+)
+@click.option(
+    "--marker",
+    type=str,
+    default=None,
+    help="Start the listing at this paging marker, as recorded in a checkpoint file.",
+)
+@namespace_options
+@common_options
+def task_successful_transfers(
+    task_id: uuid.UUID,
+    output: str,
+    output_format: str,
+    checkpoint: Union[str, None],
+    marker: Union[str, None],
+    namespace: str
+) -> None:
+    """
+    Export the source and destination paths of every file a Globus task
+    transferred successfully, as NDJSON or CSV.  Records are written one
+    page at a time, so memory use does not grow with the size of the task.
+
+    \b
+    With --checkpoint and --output FILE, an interrupted export can be
+    rerun with the same options: the output file is truncated back to the
+    end of the last completed page and paging resumes from its marker, so
+    each record is written exactly once.
+    """
+    task_id = str(task_id)
+    output_format = output_format.lower()
+    state = _load_checkpoint(checkpoint, task_id) if checkpoint else None
+    if state and marker:
+        raise click.UsageError("--marker cannot be used when resuming from a --checkpoint file.")
+    if state:
+        marker = state["marker"]
+    records = state.get("records", 0) if state else 0
+
+    if output == "-":
+        out = sys.stdout
+        if state:
+            click.echo(f"Resuming after {records} records from {checkpoint}", err=True)
+    elif state:
+        if not os.path.exists(output):
+            raise click.BadParameter(f"Cannot resume: output file {output} does not exist", param_hint="'--output'")
+        out = open(output, "r+", newline="")
+        out.seek(state.get("offset") or 0)
+        out.truncate()
+    else:
+        out = open(output, "w", newline="")
+
+    fieldnames = record_keys(SUCCESSFUL_TRANSFER_FIELDS)
+    writer = csv.DictWriter(out, fieldnames=fieldnames, lineterminator="\n") if output_format == "csv" else None
+    if writer and marker is None:
+        writer.writeheader()
+
+    tc = transfer_client(namespace=namespace)
+    try:
+        for transfers, next_marker in iter_successful_transfer_pages(tc, task_id, marker=marker):
+            rows = iter_records(transfers, SUCCESSFUL_TRANSFER_FIELDS)
+            if writer:
+                writer.writerows(rows)
+            else:
+                write_ndjson(rows, out)
+            out.flush()
+            records += len(transfers)
+            if checkpoint and next_marker:
+                _save_checkpoint(checkpoint, {
+                    "task_id": task_id,
+                    "marker": next_marker,
+                    "offset": out.tell() if out.seekable() else None,
+                    "records": records,
+                })
+    except (GlobusAPIError, NetworkError) as e:
+        logger.error(f"Error: {e}")
+        click.echo(f"Failed to get successful transfers after {records} records.", err=True)
+        if checkpoint:
+            click.echo(f"Rerun with --checkpoint {checkpoint} to resume.", err=True)
+        sys.exit(1)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    if checkpoint and os.path.exists(checkpoint):
+        os.remove(checkpoint)
+    if output != "-":
+        click.echo(f"Wrote {records} successful transfers to {output}", err=True)
+
 def add_commands(group):
     """ Add task management commands to a click group. """
     group.add_command(get_task)
     group.add_command(task_list)
     group.add_command(task_event_list)
     group.add_command(cancel_task)
+    group.add_command(task_wait)
+    group.add_command(task_watch)
+    group.add_command(task_successful_transfers)
@@ -1,8 +1,12 @@
 import os
-import sys
 import json
+import hashlib
+import posixpath
+import time
 import typing as t
+import uuid
 import textwrap
+from concurrent.futures import ThreadPoolExecutor
 
 import click
 from globus_sdk import TransferData, GlobusAPIError, NetworkError
@@ -11,8 +15,14 @@ from .lib import (
     common_options, 
     task_submission_options,
     transfer_client,
-    process_json_stream,
+    iter_manifest,
     validate_endpoint,
+    iter_successful_transfer_pages,
+    TERMINAL_STATUSES,
+    NAMESPACES,
+    chunk_label,
+    list_directory,
+    submit_chunks,
     TACC_BASE_PATH,
     TACC_GLOBUS_ENDPOINT,
 )
@@ -20,27 +30,246 @@ from .lib import (
 import logging
 logger = logging.getLogger(__name__)
 
-def add_batch_to_transfer_data(batch, transfer_data, destination_endpoint):
-    """ Add batch of files to transfer data object. """
+def _destination_path(dest_file, destination_endpoint):
+    """
+    Prepend the TACC base path to destination paths on the TACC endpoint.
+    Paths already under the base path, such as those written to a
+    --failed-batch manifest, are left as they are.
+    """
+    if destination_endpoint == TACC_GLOBUS_ENDPOINT and not dest_file.startswith(TACC_BASE_PATH + '/'):
+        return os.path.join(TACC_BASE_PATH, dest_file.lstrip('/'))
+    return dest_file
 
-    batch_json = process_json_stream(batch)
+def iter_batch_items(batch, destination_endpoint, recursive=False):
+    """
+    Yield (source_file, destination_file, size, recursive) tuples from a batch
+    manifest, reading the manifest incrementally.  size is None unless the
+    manifest entry provides one, and a JSON entry may set its own 'recursive'
+    flag to override the default.
+    """
+    for n, entry in enumerate(iter_manifest(batch, ("source_file", "destination_file"), optional=("size",)), 1):
+        size = entry.get('size')
+        if size is not None:
+            try:
+                size = int(size)
+            except (TypeError, ValueError):
+                raise click.BadParameter(f"Invalid size in manifest entry {n}: {size}", param_hint="'--batch'")
+        yield (
+            entry['source_file'],
+            _destination_path(entry['destination_file'], destination_endpoint),
+            size,
+            bool(entry.get('recursive', recursive)),
+        )
 
+def add_batch_to_transfer_data(batch, transfer_data, destination_endpoint, recursive=False):
+    """ Add batch of files to transfer data object, reading the manifest incrementally. """
+
+    return add_items_to_transfer_data(iter_batch_items(batch, destination_endpoint, recursive), transfer_data)
+
+def add_items_to_transfer_data(items, transfer_data):
+    """ Add (source, destination, size, recursive) items to a transfer data object. """
+
+    for source_file, dest_file, _, recursive in items:
+        transfer_data.add_item(source_file, dest_file, recursive=recursive)
+
+    return transfer_data
+
+def _directory_index(tc, endpoint, path):
+    """
+    Return a {name: (size, last_modified)} index of the files in one endpoint
+    directory.  A missing directory yields an empty index; None is returned if
+    the directory could not be listed.
+    """
     try:
-        files = batch_json['files']
-    except KeyError:
-        logger.error("[add_batch_to_transfer_data] Files missing from JSON or command-line input")
-        sys.exit(1)
+        _, entries, _ = list_directory(tc, endpoint, path, filter="type:file", need_dirs=False)
+    except GlobusAPIError as e:
+        if e.http_status == 404:
+            return {}
+        logger.warning(f"[skip_existing_items] Unable to list {path} on {endpoint}: {e.code} {e.message}")
+        return None
+    except NetworkError as e:
+        logger.warning(f"[skip_existing_items] Unable to list {path} on {endpoint}: {e}")
+        return None
+    return {item['name']: (item['size'], item['last_modified']) for item in entries}
+
+def skip_existing_items(tc, items, source_endpoint, destination_endpoint, compare_mtime=False, workers=8):
+    """
+    Drop batch items whose destination file already exists with the same size
+    as the source file (and, with compare_mtime, a modification time no older
+    than the source).  Each unique parent directory named in the manifest is
+    listed once, in parallel, into an in-memory index.  Source directories are
+    only listed for items without a manifest size, or when comparing mtimes.
+    Recursive items are passed through for Globus to sync.  The manifest is
+    read in full before any item is returned.
+    """
+    items = list(items)
+    files = [item for item in items if not item[3]]
+
+    targets = {(destination_endpoint, posixpath.dirname(item[1])) for item in files}
+    targets.update(
+        (source_endpoint, posixpath.dirname(item[0]))
+        for item in files
+        if item[2] is None or compare_mtime
+    )
+    targets = sorted(targets)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        listings = dict(zip(targets, executor.map(lambda target: _directory_index(tc, *target), targets)))
+
+    def _is_current(item):
+        source_file, dest_file, size, recursive = item
+        if recursive:
+            return False
+        dest_index = listings[(destination_endpoint, posixpath.dirname(dest_file))]
+        if not dest_index or posixpath.basename(dest_file) not in dest_index:
+            return False
+        dest_size, dest_mtime = dest_index[posixpath.basename(dest_file)]
+        source_size = source_mtime = None
+        source_index = listings.get((source_endpoint, posixpath.dirname(source_file)))
+        if source_index and posixpath.basename(source_file) in source_index:
+            source_size, source_mtime = source_index[posixpath.basename(source_file)]
+        if size is not None:
+            source_size = size
+        if source_size is None or source_size != dest_size:
+            return False
+        if compare_mtime and (source_mtime is None or dest_mtime < source_mtime):
+            return False
+        return True
+
+    remaining = [item for item in items if not _is_current(item)]
+    click.echo(f"Skipping {len(items) - len(remaining)} of {len(items)} files already present on the destination.")
+    return remaining
+
+def find_task(task_id, namespaces):
+    """
+    Return (namespace, task document) for the first client namespace that
+    can see the task.
+    """
+    for namespace in namespaces:
+        try:
+            return namespace, transfer_client(namespace=namespace).get_task(task_id)
+        except GlobusAPIError as e:
+            if e.http_status in (403, 404):
+                continue
+            raise
+    raise click.BadParameter(f"Task {task_id} not found.", param_hint="'--resubmit-from'")
+
+def _transfer_key(source_path, destination_path):
+    return hashlib.blake2b(
+        f"{posixpath.normpath(source_path)}\0{posixpath.normpath(destination_path)}".encode(),
+        digest_size=16,
+    ).digest()
 
-    for i in range(len(files)):
-        source_file = files[i]['source_file']
-        dest_file = files[i]['destination_file']
-        if destination_endpoint == TACC_GLOBUS_ENDPOINT:
-            # prepend TACC base path to destination file
-            dest_file = os.path.join(TACC_BASE_PATH, dest_file.lstrip('/'))
-        transfer_data.add_item(source_file, dest_file)
+def successful_transfer_keys(tc, task_id):
+    """
+    Return the set of (source, destination) pairs a task transferred
+    successfully, streamed from the successful-transfers API one page at a
+    time.  Pairs are stored as 16 byte digests rather than path strings to
+    keep the set small for tasks with millions of files.
+    """
+    keys = set()
+    for transfers, _ in iter_successful_transfer_pages(tc, task_id):
+        keys.update(_transfer_key(t['source_path'], t['destination_path']) for t in transfers)
+    return keys
 
+def drop_transferred_items(items, transferred):
+    """
+    Yield the batch items whose (source, destination) pair is not in the
+    transferred set.  Recursive items cannot be matched against individual
+    files and are always yielded.
+    """
+    total = dropped = 0
+    for item in items:
+        total += 1
+        if not item[3] and _transfer_key(item[0], item[1]) in transferred:
+            dropped += 1
+            continue
+        yield item
+    click.echo(f"Skipping {dropped} of {total} files already transferred by the original task.")
+
+def chunk_batch_items(items, max_items=None, max_bytes=None):
+    """
+    Group batch items into lists holding at most max_items entries and at most
+    max_bytes bytes.  An item larger than max_bytes is placed in a chunk of
+    its own.
+    """
+    chunk = []
+    chunk_bytes = 0
+    for item in items:
+        size = item[2]
+        if max_bytes and size is None:
+            raise click.BadParameter(
+                f"--max-bytes-per-task requires a size for every entry; none given for {item[0]}",
+                param_hint="'--batch'",
+            )
+        size = size or 0
+        if chunk and (
+            (max_items and len(chunk) >= max_items)
+            or (max_bytes and chunk_bytes + size > max_bytes)
+        ):
+            yield chunk
+            chunk = []
+            chunk_bytes = 0
+        chunk.append(item)
+        chunk_bytes += size
+    if chunk:
+        yield chunk
+
+def new_transfer_data(source_endpoint, destination_endpoint, label, verify_checksum, sync_level=None, items=()):
+    """
+    Create a TransferData object holding the given (source, destination, size,
+    recursive) items.  No client is attached, so the submission ID is only
+    requested when the task is submitted.
+    """
+    transfer_data = TransferData(
+        source_endpoint=source_endpoint,
+        destination_endpoint=destination_endpoint,
+        label=label,
+        verify_checksum=verify_checksum,
+        sync_level=sync_level,
+    )
+    for source_file, dest_file, _, recursive in items:
+        transfer_data.add_item(source_file, dest_file, recursive=recursive)
     return transfer_data
 
+def submit_transfer_data(tc, transfer_data):
+    """ Submit a transfer task, logging API and network errors. """
+    try:
+        return tc.submit_transfer(transfer_data)
+    except GlobusAPIError as e:
+        msg = ("[submit_rda_transfer] Globus API Error\n"
+               "HTTP status: {}\n"
+               "Error code: {}\n"
+               "Error message: {}").format(e.http_status, e.code, e.message)
+        logger.error(msg)
+        raise e
+    except NetworkError:
+        logger.error("[submit_rda_transfer] Network Failure. "
+               "Possibly a firewall or connectivity issue")
+        raise
+
+def echo_transfer_data(data):
+    """ Print the contents of a transfer submission as a sanity check. """
+    click.echo(f"Source endpoint ID: {data['source_endpoint']}")
+    click.echo(f"Destination endpoint ID: {data['destination_endpoint']}")
+    try:
+        click.echo(f"Label: {data['label']}")
+    except KeyError:
+        click.echo("Label: None")
+    click.echo(f"Verify checksum: {data['verify_checksum']}")
+    click.echo(f"Sync level: {data.get('sync_level')}")
+    click.echo("Transfer items:")
+    click.echo("{}".format(json.dumps(data['DATA'], indent=2)))
+
+def write_failed_items(transfer_data, failed_batch):
+    """ Append the items of a chunk that failed to submit to an NDJSON batch file. """
+    for item in transfer_data['DATA']:
+        failed_batch.write(json.dumps({
+            "source_file": item['source_path'],
+            "destination_file": item['destination_path'],
+        }) + "\n")
+    failed_batch.flush()
+
 @click.command(
     "transfer",
     help="Submit a Globus transfer task.",
@@ -88,33 +317,74 @@ def add_batch_to_transfer_data(batch, transfer_data, destination_endpoint):
      ]
    }
    <Ctrl+D>
+
+4. The batch file may also be NDJSON (one JSON object per line) or plain text
+with a source and destination path on each line:
+
+\b
+   /data/d999009/file1.tar  /d999009/file1.tar
+   /data/d999009/file2.tar  /d999009/file2.tar
+
+5. Split a large batch into transfer tasks of at most 10000 files each, labelled
+'d999009 push part 1', 'd999009 push part 2', ..., and submit up to 8 at a time:
+
+\b
+   $ dsglobus transfer \\
+       --source-endpoint gdex-glade \\
+       --destination-endpoint gdex-quasar \\
+       --batch /path/to/batch.json \\
+       --label "d999009 push" \\
+       --max-items-per-task 10000 \\
+       --max-concurrent-submissions 8 \\
+       --failed-batch /path/to/failed.ndjson
+
+6. Synchronize a dataset directory to Quasar, transferring only files that are
+missing or whose size differs on the destination:
+
+\b
+   $ dsglobus transfer \\
+       --source-endpoint gdex-glade \\
+       --destination-endpoint gdex-quasar \\
+       --source-file /data/d999009/ \\
+       --destination-file /d999009/ \\
+       --recursive \\
+       --sync-level size
+
+7. Resubmit only the files of a partly failed task that did not arrive.  The
+endpoints default to those of the original task:
+
+\b
+   $ dsglobus transfer \\
+       --resubmit-from TASK_ID \\
+       --manifest /path/to/batch.json \\
+       --max-items-per-task 10000
 ''',
 )
 @click.option(
     "--source-endpoint",
 	"-se",
-	required=True,
+    default=None,
     callback=validate_endpoint,
-    help="Source endpoint ID or name (alias).",
+    help="Source endpoint ID or name (alias).  Required unless --resubmit-from is used.",
 )
 @click.option(
     "--destination-endpoint",
 	"-de",
-	required=True,
+    default=None,
     callback=validate_endpoint,
-    help="Destination endpoint ID or name (alias).",
+    help="Destination endpoint ID or name (alias).  Required unless --resubmit-from is used.",
 )
 @click.option(
 	"--source-file",
     "-sf",
     default=None,
-    help="Path to source file name, relative to source endpoint host path. Ignored if --batch is used.",
+    help="Path to source file name (or directory, with --recursive), relative to source endpoint host path. Ignored if --batch is used.",
 )
 @click.option(
 	"--destination-file",
     "-df",
     default=None,
-    help="Path to destination file name, relative to destination endpoint host path. Ignored if --batch is used.",
+    help="Path to destination file name (or directory, with --recursive), relative to destination endpoint host path. Ignored if --batch is used.",
 )
 @click.option(
 	"--verify-checksum/--no-verify-checksum",
@@ -125,14 +395,112 @@ def add_batch_to_transfer_data(batch, transfer_data, destination_endpoint):
 )
 @click.option(
 	"--batch",
+    "--manifest",
+    "batch",
 	type=click.File('r'),
     help=textwrap.dedent("""\
         Accept a batch of source/destination file pairs from a file. 
         Use '-' to read from stdin, and close the stream with 'Ctrl+D'.  
-        Uses --source-endpoint and --destination-endpoint as passed 
+        The file may be JSON, NDJSON (one object per line) or plain 
+        text with two tab/space separated columns.  Uses 
+        --source-endpoint and --destination-endpoint as passed 
         on the command line.  See examples below.
     """),
 )
+@click.option(
+    "--resubmit-from",
+    type=click.UUID,
+    default=None,
+    help=textwrap.dedent("""\
+        ID of an earlier transfer task.  Only the --batch entries that the 
+        task did not transfer successfully are submitted.  The endpoints 
+        default to those of the task.
+    """),
+)
+@click.option(
+    "--recursive",
+    "-r",
+    is_flag=True,
+    default=False,
+    help=textwrap.dedent("""\
+        Transfer directories recursively.  --source-file and 
+        --destination-file (or the --batch entries) are then directory 
+        paths.  A JSON batch entry may set its own "recursive" value.
+    """),
+)
+@click.option(
+    "--sync-level",
+    "-s",
+    type=click.Choice(["exists", "size", "mtime", "checksum"]),
+    default=None,
+    help=textwrap.dedent("""\
+        Only transfer files whose destination copy is missing ('exists'), 
+        differs in size ('size'), is older than the source ('mtime') or 
+        has a different checksum ('checksum').  Files already up to date 
+        on the destination are skipped.
+    """),
+)
+@click.option(
+    "--skip-existing",
+    is_flag=True,
+    default=False,
+    help=textwrap.dedent("""\
+        With --batch, list the destination directories named in the 
+        manifest and leave out files that already exist there with the 
+        same size as the source.
+    """),
+)
+@click.option(
+    "--compare-mtime",
+    is_flag=True,
+    default=False,
+    help="With --skip-existing, also resubmit files whose destination copy is older than the source.",
+)
+@click.option(
+    "--listing-workers",
+    type=click.IntRange(min=1),
+    default=8,
+    show_default=True,
+    help="Number of concurrent directory listings used by --skip-existing.",
+)
+@click.option(
+    "--max-items-per-task",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Split a --batch manifest into several transfer tasks of at most this many files each.",
+)
+@click.option(
+    "--max-bytes-per-task",
+    type=click.IntRange(min=1),
+    default=None,
+    help=textwrap.dedent("""\
+        Split a --batch manifest into several transfer tasks of at most this 
+        many bytes each.  Every manifest entry must then provide a size, as a 
+        'size' key or a third text column.
+    """),
+)
+@click.option(
+    "--max-concurrent-submissions",
+    type=click.IntRange(min=1),
+    default=4,
+    show_default=True,
+    help="Maximum number of chunked transfer tasks submitted concurrently.",
+)
+@click.option(
+    "--submission-queue-depth",
+    type=click.IntRange(min=1),
+    default=None,
+    help=textwrap.dedent("""\
+        Number of full chunks that may wait for a free submitter while the 
+        manifest is parsed.  Defaults to --max-concurrent-submissions.
+    """),
+)
+@click.option(
+    "--failed-batch",
+    type=click.File('w'),
+    default=None,
+    help="Write the files of chunks that could not be submitted to this file, as an NDJSON batch for resubmission.",
+)
 @common_options
 @task_submission_options
 def transfer_command(
@@ -142,6 +510,17 @@ def transfer_command(
     destination_file: str,
     verify_checksum: bool,
     batch: t.TextIO,
+    resubmit_from: t.Optional[uuid.UUID],
+    recursive: bool,
+    sync_level: t.Optional[str],
+    skip_existing: bool,
+    compare_mtime: bool,
+    listing_workers: int,
+    max_items_per_task: t.Optional[int],
+    max_bytes_per_task: t.Optional[int],
+    max_concurrent_submissions: int,
+    submission_queue_depth: t.Optional[int],
+    failed_batch: t.Optional[t.TextIO],
     dry_run: bool,
     label: str
     ) -> None:
@@ -149,58 +528,145 @@ def transfer_command(
     if source_file is None and destination_file is None and batch is None:
         raise click.UsageError('--source-file and --destination-file, or --batch is required.')
 
+    transferred = None
+    if resubmit_from:
+        # the Transfer API does not return the items a task was submitted with
+        if batch is None:
+            raise click.UsageError('--resubmit-from requires the original file list as --batch/--manifest.')
+        if TACC_GLOBUS_ENDPOINT in (source_endpoint, destination_endpoint):
+            namespaces = ["tacc"] + [ns for ns in NAMESPACES if ns != "tacc"]
+        else:
+            namespaces = list(NAMESPACES)
+        namespace, task = find_task(resubmit_from, namespaces)
+        if task['type'] != "TRANSFER":
+            raise click.BadParameter(f"Task {resubmit_from} is a {task['type']} task.", param_hint="'--resubmit-from'")
+        if task['status'] not in TERMINAL_STATUSES:
+            raise click.UsageError(
+                f"Task {resubmit_from} is {task['status']}.  Wait for it to finish (see 'dsglobus task-wait') before resubmitting."
+            )
+        source_endpoint = source_endpoint or task['source_endpoint_id']
+        destination_endpoint = destination_endpoint or task['destination_endpoint_id']
+        label = label or f"{task['label'] or resubmit_from} resubmit"
+        try:
+            transferred = successful_transfer_keys(transfer_client(namespace=namespace), resubmit_from)
+        except (GlobusAPIError, NetworkError) as e:
+            logger.error(f"Error getting successful transfers of task {resubmit_from}: {e}")
+            raise click.Abort()
+        click.echo(f"Task {resubmit_from} ({task['status']}) transferred {len(transferred)} files.")
+    elif source_endpoint is None or destination_endpoint is None:
+        raise click.UsageError('--source-endpoint and --destination-endpoint are required.')
+
     if source_endpoint == TACC_GLOBUS_ENDPOINT or destination_endpoint == TACC_GLOBUS_ENDPOINT:
         tc = transfer_client(namespace="tacc")
     else:
         tc = transfer_client()
-		
+
+    items = None
+    if batch:
+        items = iter_batch_items(batch, destination_endpoint, recursive)
+        if transferred is not None:
+            items = drop_transferred_items(items, transferred)
+        if skip_existing:
+            items = skip_existing_items(
+                tc, items, source_endpoint, destination_endpoint, compare_mtime, listing_workers
+            )
+
+    if items is not None and (max_items_per_task or max_bytes_per_task):
+        chunked_transfer(
+            tc,
+            items,
+            source_endpoint,
+            destination_endpoint,
+            label or time.strftime("dsglobus batch %Y-%m-%d %H%M%S"),
+            verify_checksum,
+            sync_level,
+            max_items_per_task,
+            max_bytes_per_task,
+            max_concurrent_submissions,
+            submission_queue_depth or max_concurrent_submissions,
+            failed_batch,
+            dry_run,
+        )
+        return
+
     transfer_data = TransferData(
         transfer_client=tc,
         source_endpoint=source_endpoint,
         destination_endpoint=destination_endpoint,
         label=label,
-        verify_checksum=verify_checksum
+        verify_checksum=verify_checksum,
+        sync_level=sync_level,
     )
 
-    if batch:
-        transfer_data = add_batch_to_transfer_data(batch, transfer_data, destination_endpoint)
+    if items is not None:
+        transfer_data = add_items_to_transfer_data(items, transfer_data)
+        if not transfer_data['DATA']:
+            click.echo("No files left to transfer.")
+            return
     else:
         if source_file is None or destination_file is None:
             raise click.UsageError('--source-file and --destination-file are required is --batch is not used.')
-        if destination_endpoint == TACC_GLOBUS_ENDPOINT:
-            # prepend TACC base path to destination file
-            destination_file = os.path.join(TACC_BASE_PATH, destination_file.lstrip('/'))
-        transfer_data.add_item(source_file, destination_file)
+        transfer_data.add_item(
+            source_file,
+            _destination_path(destination_file, destination_endpoint),
+            recursive=recursive,
+        )
 		
     if dry_run:
-        data = transfer_data.data
-        click.echo(f"Source endpoint ID: {data['source_endpoint']}")
-        click.echo(f"Destination endpoint ID: {data['destination_endpoint']}")
-        try:
-            click.echo(f"Label: {data['label']}")
-        except KeyError:
-            click.echo("Label: None")
-        click.echo(f"Verify checksum: {data['verify_checksum']}")
-        click.echo("Transfer items:")
-        click.echo("{}".format(json.dumps(data['DATA'], indent=2)))
+        echo_transfer_data(transfer_data.data)
 
         # exit safely
         return
 
-    try:
-        res = tc.submit_transfer(transfer_data)
-        task_id = res["task_id"]
-    except GlobusAPIError as e:
-        msg = ("[submit_rda_transfer] Globus API Error\n"
-               "HTTP status: {}\n"
-               "Error code: {}\n"
-               "Error message: {}").format(e.http_status, e.code, e.message)
-        logger.error(msg)
-        raise e
-    except NetworkError:
-        logger.error("[submit_rda_transfer] Network Failure. "
-               "Possibly a firewall or connectivity issue")
-        raise
+    res = submit_transfer_data(tc, transfer_data)
+    task_id = res["task_id"]
 	
     msg = "{0}\nTask ID: {1}".format(res['message'], task_id)
-    click.echo(f"""{msg}""")
\ No newline at end of file
+    click.echo(f"""{msg}""")
+
+def chunked_transfer(
+    tc,
+    items,
+    source_endpoint,
+    destination_endpoint,
+    label,
+    verify_checksum,
+    sync_level,
+    max_items,
+    max_bytes,
+    max_concurrent,
+    queue_depth,
+    failed_batch,
+    dry_run,
+):
+    """
+    Split batch items into several transfer tasks labelled '<label> part N'
+    and submit them through a ChunkSubmitter pipeline while the manifest is
+    still being parsed.  Exits with status 1 if any part could not be
+    submitted.
+    """
+    chunks = (
+        new_transfer_data(
+            source_endpoint,
+            destination_endpoint,
+            chunk_label(label, part),
+            verify_checksum,
+            sync_level,
+            chunk,
+        )
+        for part, chunk in enumerate(chunk_batch_items(items, max_items, max_bytes), 1)
+    )
+
+    if dry_run:
+        for td in chunks:
+            echo_transfer_data(td.data)
+        return
+
+    submit_chunks(
+        lambda td: submit_transfer_data(tc, td),
+        chunks,
+        label,
+        max_concurrent,
+        queue_depth,
+        on_failure=(lambda td: write_failed_items(td, failed_batch)) if failed_batch else None,
+    )
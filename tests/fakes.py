@@ -0,0 +1,61 @@
+""" Fake Globus objects shared by the tests. """
+import json
+import threading
+
+import requests
+from globus_sdk import GlobusAPIError
+
+def api_error(status, code="Error", message="error"):
+    """ A GlobusAPIError for an HTTP error response with the given status. """
+    response = requests.Response()
+    response.status_code = status
+    response._content = json.dumps({"code": code, "message": message}).encode()
+    response.headers["Content-Type"] = "application/json"
+    response.request = requests.Request("GET", "https://transfer.api.globus.org/v0.10/").prepare()
+    return GlobusAPIError(response)
+
+class Listing(list):
+    """ An operation_ls response: the entries of a directory and its "path". """
+
+    def __init__(self, path, entries):
+        super().__init__(entries)
+        self.path = path
+
+    def __getitem__(self, key):
+        if key == "path":
+            return self.path
+        return super().__getitem__(key)
+
+class TreeClient:
+    """
+    Fake TransferClient serving operation_ls from a tree of {dirpath:
+    entries}.  Entries are dicts or (name, type, size[, last_modified])
+    tuples, and unknown directories are empty.  The 'type:dir' and
+    'type:file' filters and name suffix filters such as 'name:~*.nc' are
+    applied.  Every call is recorded in ``calls`` as (path, filter).
+    """
+
+    def __init__(self, tree, default_path="/"):
+        self.tree = tree
+        self.default_path = default_path
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def operation_ls(self, endpoint, path=None, filter=None):
+        path = path or self.default_path
+        with self.lock:
+            self.calls.append((path, filter))
+        entries = [
+            entry if isinstance(entry, dict) else dict(zip(("name", "type", "size", "last_modified"), entry))
+            for entry in self.tree.get(path, [])
+        ]
+        if filter in ("type:dir", "type:file"):
+            entries = [e for e in entries if e["type"] == filter[5:]]
+        elif filter:
+            entries = [e for e in entries if e["name"].endswith(filter.rsplit("*", 1)[-1])]
+        return Listing(path, entries)
+
+    @property
+    def listed(self):
+        """ The paths listed, in call order. """
+        return [path for path, _ in self.calls]
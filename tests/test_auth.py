@@ -0,0 +1,94 @@
+import threading
+import time
+import types
+
+from rda_python_globus.lib import auth
+
+class _Storage:
+    def __init__(self, path, namespace):
+        self.path = path
+        self.namespace = namespace
+        self.writing = 0
+        self.overlapped = False
+        self.stored = []
+
+    def get_token_data(self, resource_server):
+        return types.SimpleNamespace(
+            access_token=f"{self.namespace}-access",
+            refresh_token=f"{self.namespace}-refresh",
+            expires_at_seconds=time.time() + 3600,
+        )
+
+    def store_token_response(self, response):
+        self.writing += 1
+        self.overlapped = self.overlapped or self.writing > 1
+        time.sleep(0.01)
+        self.stored.append(response)
+        self.writing -= 1
+
+def _fresh_pool(monkeypatch):
+    monkeypatch.setattr(auth, "JSONTokenStorage", _Storage)
+    monkeypatch.setattr(auth, "NAMESPACES", {"DEFAULT": ("default-id", "default.json"), "tacc": ("tacc-id", "tacc.json")})
+    for func, attr in (
+        (auth.token_storage_adapter, "_instances"),
+        (auth.internal_auth_client, "_instances"),
+        (auth.transfer_client, "_clients"),
+    ):
+        monkeypatch.delattr(func, attr, raising=False)
+
+def test_clients_and_token_storage_are_cached_per_namespace(monkeypatch):
+    _fresh_pool(monkeypatch)
+
+    default = auth.transfer_client()
+    tacc = auth.transfer_client(namespace="tacc")
+    assert auth.transfer_client() is default
+    assert auth.transfer_client(namespace="tacc") is tacc
+    assert tacc is not default
+
+    # each namespace keeps its own token file and tokens
+    assert auth.token_storage_adapter("DEFAULT").path == "default.json"
+    assert auth.token_storage_adapter("tacc").path == "tacc.json"
+    assert auth.token_storage_adapter("tacc") is auth.token_storage_adapter("tacc")
+    assert default.authorizer.access_token == "DEFAULT-access"
+    assert tacc.authorizer.access_token == "tacc-access"
+    assert tacc.authorizer.auth_client.client_id == "tacc-id"
+
+def test_concurrent_requests_refresh_tokens_once(monkeypatch):
+    _fresh_pool(monkeypatch)
+    authorizer = auth.transfer_client(namespace="tacc").authorizer
+    refreshes = []
+
+    def oauth2_refresh_token(refresh_token):
+        refreshes.append(refresh_token)
+        time.sleep(0.01)
+        return types.SimpleNamespace(by_resource_server={
+            auth.TRANSFER_RESOURCE_SERVER: {
+                "access_token": "new-access",
+                "expires_at_seconds": time.time() + 3600,
+            }
+        })
+
+    monkeypatch.setattr(authorizer.auth_client, "oauth2_refresh_token", oauth2_refresh_token)
+    authorizer.handle_missing_authorization()
+
+    headers = []
+    threads = [threading.Thread(target=lambda: headers.append(authorizer.get_authorization_header())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    storage = auth.token_storage_adapter("tacc")
+    assert refreshes == ["tacc-refresh"]
+    assert headers == ["Bearer new-access"] * 8
+    assert len(storage.stored) == 1 and not storage.overlapped
+
+def test_token_writes_are_serialized():
+    storage = _Storage("tokens.json", "DEFAULT")
+    on_refresh = auth._store_tokens(storage)
+    threads = [threading.Thread(target=on_refresh, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(storage.stored) == list(range(8)) and not storage.overlapped
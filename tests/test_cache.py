@@ -0,0 +1,39 @@
+from rda_python_globus.lib.cache import CachingTransferClient, ListingCache
+from tests.fakes import Listing, TreeClient
+
+ENTRY = {"name": "a.nc", "type": "file", "size": 1}
+
+def _client():
+    return TreeClient({"/d": [ENTRY]}, default_path="/~/")
+
+def test_listing_cache_hits_expiry_and_refresh(tmp_path):
+    cache = ListingCache(str(tmp_path / "ls.sqlite"), ttl=3600, max_bytes=10**6)
+    client = _client()
+    tc = CachingTransferClient(client, cache)
+
+    first = tc.operation_ls("ep", path="/d")
+    second = tc.operation_ls("ep", path="/d")
+    assert len(client.calls) == 1
+    assert second["path"] == "/d" and list(second) == list(first)
+    assert tc.operation_ls("ep", path="/d", filter="type:dir") is not None
+    assert (cache.hits, cache.misses) == (1, 2)
+
+    CachingTransferClient(client, cache, refresh=True).operation_ls("ep", path="/d")
+    assert len(client.calls) == 3
+
+    cache.ttl = 0
+    tc.operation_ls("ep", path="/d")
+    assert len(client.calls) == 4
+    cache.close()
+
+def test_listing_cache_evicts_least_recently_used(tmp_path):
+    cache = ListingCache(str(tmp_path / "ls.sqlite"), ttl=3600, max_bytes=200)
+    for n in range(5):
+        cache.put("ep", f"/d{n}", None, Listing(f"/d{n}", [ENTRY]))
+    cache.get("ep", "/d0", None)
+    cache.close()
+
+    cache = ListingCache(str(tmp_path / "ls.sqlite"), ttl=3600, max_bytes=200)
+    assert cache.get("ep", "/d0", None) is not None
+    assert cache.get("ep", "/d1", None) is None
+    assert cache.get("ep", "/d4", None) is not None
@@ -0,0 +1,61 @@
+from rda_python_globus.lib.events import EventSummary, event_paths, event_signature
+
+def _fault(time, path, offset, server="10.0.0.1:2811"):
+    return {
+        "time": time,
+        "code": "PERMISSION_DENIED",
+        "description": "permission denied",
+        "details": f"Server: {server}\nFile: {path}\nMessage: 550 Permission denied on {path} at offset {offset}",
+    }
+
+def test_signature_removes_paths_hosts_and_numbers_but_keeps_status_codes():
+    a = event_signature(_fault("t", "/glade/a.nc", 0))
+    b = event_signature(_fault("t", "/glade/sub/b.nc", 123456, server="10.0.0.2:2811"))
+    assert a == b
+    assert "550" in a and "<path>" in a and "<host>" in a
+
+def test_event_paths_ignores_urls():
+    assert event_paths("File: /glade/a.nc URL gsiftp://host/glade/a.nc") == {"/glade/a.nc"}
+
+def test_summary_groups_and_counts():
+    summary = EventSummary()
+    summary.add(_fault("2026-01-01T00:00:02", "/glade/a.nc", 1))
+    summary.add(_fault("2026-01-01T00:00:01", "/glade/a.nc", 2))
+    summary.add(_fault("2026-01-01T00:00:03", "/glade/b.nc", 3))
+    summary.add({"time": "2026-01-01T00:00:04", "code": "STARTED", "description": "started", "details": ""})
+
+    assert summary.total == 4
+    assert [(g["code"], g["count"]) for g in summary.by_code()] == [("PERMISSION_DENIED", 3), ("STARTED", 1)]
+    group = next(summary.by_signature())
+    assert (group["count"], group["first_time"], group["last_time"]) == (3, "2026-01-01T00:00:01", "2026-01-01T00:00:03")
+    assert group["top_paths"][0] == "/glade/a.nc"
+    assert list(summary.top_paths(1)) == [{"path": "/glade/a.nc", "count": 2}]
+
+def test_summary_csv_joins_top_paths(capsys):
+    from rda_python_globus.task_management import print_event_summary
+
+    summary = EventSummary()
+    summary.add(_fault("2026-01-01T00:00:01", "/glade/a.nc", 1))
+    summary.add(_fault("2026-01-01T00:00:02", "/glade/b.nc", 2))
+    print_event_summary("task", summary, 2, "csv")
+    row = capsys.readouterr().out.splitlines()[1]
+    assert ",/glade/a.nc;/glade/b.nc," in row
+    assert "[" not in row
+
+def test_summary_reports_truncation(capsys):
+    import json
+    from rda_python_globus.task_management import print_event_summary
+
+    summary = EventSummary()
+    summary.add(_fault("2026-01-01T00:00:01", "/glade/a.nc", 1))
+    summary.available = 2500
+    print_event_summary("task", summary, 1, "table")
+    assert capsys.readouterr().out.startswith("Summary of 1 of 2500 events on Task(task) (API paging limit reached)")
+
+    print_event_summary("task", summary, 1, "ndjson")
+    record = json.loads(capsys.readouterr().out)
+    assert (record["events_read"], record["events_total"], record["truncated"]) == (1, 2500, True)
+
+    # an explicit --limit is not a truncation
+    print_event_summary("task", summary, 1, "ndjson", max_results=1)
+    assert json.loads(capsys.readouterr().out)["truncated"] is False
@@ -0,0 +1,142 @@
+import json
+import threading
+import time
+
+from click.testing import CliRunner
+from globus_sdk import NetworkError
+
+from rda_python_globus import file_management
+from rda_python_globus.lib.concurrency import RateLimiter, map_unordered
+from tests.fakes import TreeClient, api_error
+
+class _RenameClient:
+    def __init__(self, fail=()):
+        self.fail = set(fail)
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def operation_rename(self, endpoint, oldpath, newpath):
+        with self.lock:
+            self.calls.append(oldpath)
+        if oldpath in self.fail:
+            raise NetworkError("connection reset", Exception())
+        return {"message": "File or directory renamed successfully"}
+
+def _rename(monkeypatch, tc, args, batch):
+    monkeypatch.setattr(file_management, "transfer_client", lambda namespace="DEFAULT": tc)
+    return CliRunner().invoke(
+        file_management.rename_command,
+        ["-ep", "11111111-1111-1111-1111-111111111111", "--batch", "-"] + args,
+        input=batch,
+    )
+
+BATCH = "".join(f"/old/{i}\t/new/{i}\n" for i in range(20))
+
+def test_map_unordered_yields_every_item_and_error():
+    def square(n):
+        if n == 3:
+            raise ValueError(n)
+        return n * n
+
+    results = {item: (result, error) for item, result, error in map_unordered(square, range(6), workers=3)}
+    assert results[4] == (16, None)
+    assert isinstance(results[3][1], ValueError)
+
+def test_rate_limiter_spaces_calls():
+    limiter = RateLimiter(rate=50, burst=1)
+    start = time.monotonic()
+    for _ in range(6):
+        limiter.acquire()
+    assert time.monotonic() - start >= 0.09
+
+def test_rename_continue_on_error_and_resume(monkeypatch, tmp_path):
+    results = tmp_path / "renames.ndjson"
+    args = ["--workers", "4", "--continue-on-error", "--results", str(results), "--resume", str(results)]
+
+    tc = _RenameClient(fail={"/old/3", "/old/7"})
+    result = _rename(monkeypatch, tc, args, BATCH)
+    assert result.exit_code == 1
+    assert len(tc.calls) == 20
+    records = [json.loads(line) for line in results.read_text().splitlines()]
+    assert sorted(r["old_path"] for r in records if r["status"] == "error") == ["/old/3", "/old/7"]
+
+    tc = _RenameClient()
+    result = _rename(monkeypatch, tc, args, BATCH)
+    assert result.exit_code == 0
+    assert sorted(tc.calls) == ["/old/3", "/old/7"]
+
+def test_rename_stops_at_first_error_by_default(monkeypatch):
+    tc = _RenameClient(fail={"/old/0"})
+    result = _rename(monkeypatch, tc, [], BATCH)
+    assert result.exit_code == 1
+    assert tc.calls == ["/old/0"]
+
+class _DeleteClient(TreeClient):
+    def __init__(self):
+        super().__init__({
+            "/scratch": [("a.nc", "file", 10), ("run1", "dir", 0)],
+            "/scratch/run1/": [("b.nc", "file", 20), ("sub", "dir", 0)],
+            "/scratch/run1/sub/": [("c.nc", "file", 30)],
+        })
+        self.submitted = []
+
+    def submit_delete(self, delete_data):
+        with self.lock:
+            self.submitted.append([item["path"] for item in delete_data["DATA"]])
+            return {"task_id": f"task-{len(self.submitted)}"}
+
+def _delete(monkeypatch, tc, args, batch):
+    monkeypatch.setattr(file_management, "transfer_client", lambda namespace="DEFAULT": tc)
+    return CliRunner().invoke(
+        file_management.delete_command,
+        ["-ep", "11111111-1111-1111-1111-111111111111", "--batch", "-"] + args,
+        input=batch,
+    )
+
+def test_delete_estimate_walks_directory_targets(monkeypatch):
+    result = _delete(monkeypatch, _DeleteClient(), ["--recursive", "--dry-run", "--estimate"],
+                     "/scratch/a.nc\n/scratch/run1/\n/scratch/gone.nc\n")
+    assert result.exit_code == 0, result.output
+    assert "Files:        3" in result.output
+    assert "Directories:  2" in result.output
+    assert "Bytes:        60" in result.output
+    assert "Not found: /scratch/gone.nc" in result.output
+
+def test_delete_chunks_batch_into_several_tasks(monkeypatch):
+    tc = _DeleteClient()
+    batch = "".join(f"/scratch/{i}.nc\n" for i in range(5))
+    result = _delete(monkeypatch, tc, ["--max-items-per-task", "2", "--label", "cleanup"], batch)
+    assert result.exit_code == 0, result.output
+    assert sorted(len(paths) for paths in tc.submitted) == [1, 2, 2]
+    assert "Submitted 3 of 3 delete tasks for 'cleanup'." in result.output
+
+def test_delete_dry_run_exits_cleanly(monkeypatch):
+    result = _delete(monkeypatch, _DeleteClient(), ["--dry-run"], "/scratch/a.nc\n")
+    assert result.exit_code == 0
+    assert "/scratch/a.nc" in result.output
+
+def test_directory_levels_dedupes_ancestors():
+    levels = file_management.directory_levels(["/d/2024/01", "/d/2024/02/", "/d/2024/01"], parents=True)
+    assert levels == [["/d"], ["/d/2024"], ["/d/2024/01", "/d/2024/02"]]
+
+def test_make_directories_skips_existing_and_below_failures():
+    class _Client:
+        def __init__(self):
+            self.calls = []
+            self.lock = threading.Lock()
+
+        def operation_mkdir(self, endpoint, path):
+            with self.lock:
+                self.calls.append(path)
+            if path == "/d":
+                raise api_error(409, code="ExternalError.MkdirFailed.Exists")
+            if path == "/d/bad":
+                raise api_error(403, code="ExternalError.MkdirFailed.PermissionDenied")
+            return {"message": "The directory was created successfully"}
+
+    tc = _Client()
+    counts = file_management.make_directories(
+        tc, "ep", ["/d/a/x", "/d/a/y", "/d/bad/z"], parents=True, existing={"/d/a"}
+    )
+    assert counts == {"created": 2, "existing": 2, "failed": 1, "skipped": 1}
+    assert sorted(tc.calls) == ["/d", "/d/a/x", "/d/a/y", "/d/bad"]
@@ -0,0 +1,55 @@
+from rda_python_globus.lib import print_table
+
+FIELDS = [("Name", "name"), ("Size", "size")]
+
+def _rows(n):
+    for i in range(n):
+        yield {"name": "f" * (i + 1), "size": None if i == 0 else i}
+
+def test_print_table_aligns_small_results(capsys):
+    print_table(_rows(3), FIELDS)
+    assert capsys.readouterr().out.splitlines() == [
+        "Name | Size",
+        "---- | ----",
+        "f    | NULL",
+        "ff   |    1",
+        "fff  |    2",
+    ]
+
+def test_print_table_streams_after_sample(capsys):
+    def rows():
+        yield from _rows(2)
+        # nothing beyond the sample may be fetched before the sample is printed
+        assert capsys.readouterr().out.splitlines()[-1].startswith("ff ")
+        yield {"name": "a-much-longer-name", "size": 10}
+
+    print_table(rows(), FIELDS, sample_size=2)
+    assert capsys.readouterr().out.splitlines() == ["a-much-longer-name |   10"]
+
+def test_print_table_fixed_widths(capsys):
+    print_table(_rows(1), FIELDS, widths=[6, 2], print_headers=False)
+    assert capsys.readouterr().out.splitlines() == ["f      | NULL"]
+
+def test_print_records_formats(capsys):
+    from rda_python_globus.lib import print_records
+
+    items = [{"name": "a,b", "size": None}, {"name": "c", "size": 2}]
+    fields = [("Name", "name"), ("Size In Bytes", lambda i: i["size"])]
+
+    print_records(iter(items), fields, "ndjson")
+    assert capsys.readouterr().out.splitlines() == [
+        '{"name": "a,b", "size_in_bytes": null}',
+        '{"name": "c", "size_in_bytes": 2}',
+    ]
+
+    print_records(iter(items), fields, "csv")
+    assert capsys.readouterr().out.splitlines() == ["name,size_in_bytes", '"a,b",', "c,2"]
+
+    import json
+    print_records(iter(items), fields, "json")
+    assert json.loads(capsys.readouterr().out) == [
+        {"name": "a,b", "size_in_bytes": None},
+        {"name": "c", "size_in_bytes": 2},
+    ]
+    print_records(iter([]), fields, "json")
+    assert json.loads(capsys.readouterr().out) == []
@@ -0,0 +1,38 @@
+from rda_python_globus.lib.cache import SubtreeSizeCache
+from rda_python_globus.list import disk_usage
+from tests.fakes import TreeClient
+
+TREE = {
+    "/": [("a", "file", 1, "t0"), ("x", "dir", 0, "t1"), ("y", "dir", 0, "t1")],
+    "/x/": [("b", "file", 2, "t0"), ("deep", "dir", 0, "t1")],
+    "/x/deep/": [("c", "file", 4, "t0"), ("d", "file", 8, "t0")],
+    "/y/": [],
+}
+
+def test_disk_usage_totals():
+    usage = disk_usage(TreeClient(TREE), "ep", max_depth=1)
+    assert usage == {"/": (0, 4, 15), "/x/": (1, 3, 14), "/y/": (1, 0, 0)}
+
+def test_disk_usage_reuses_cached_subtrees(tmp_path):
+    cache = SubtreeSizeCache(str(tmp_path / "du.json"))
+    disk_usage(TreeClient(TREE), "ep", cache=cache)
+    cache.save()
+
+    tc = TreeClient(TREE)
+    usage = disk_usage(tc, "ep", cache=SubtreeSizeCache(str(tmp_path / "du.json")))
+    assert usage == {"/": (0, 4, 15)}
+    assert tc.listed == ["/"]
+
+def test_disk_usage_cache_misses_changes_below_a_cached_directory(tmp_path):
+    cache = SubtreeSizeCache(str(tmp_path / "du.json"))
+    disk_usage(TreeClient(TREE), "ep", cache=cache)
+
+    # a file added to /x/deep/ changes the mtime of /x/deep/ but not of /x/
+    tree = dict(TREE, **{"/x/deep/": TREE["/x/deep/"] + [("e", "file", 1000, "t0")]})
+    tree["/x/"] = [("b", "file", 2, "t0"), ("deep", "dir", 0, "t2")]
+    assert disk_usage(TreeClient(tree), "ep", cache=cache) == {"/": (0, 4, 15)}
+    assert disk_usage(TreeClient(tree), "ep") == {"/": (0, 5, 1015)}
+
+    # a change to the cached directory's own entries is picked up
+    tree["/"] = [("a", "file", 1, "t0"), ("x", "dir", 0, "t3"), ("y", "dir", 0, "t1")]
+    assert disk_usage(TreeClient(tree), "ep", cache=cache) == {"/": (0, 5, 1015)}
@@ -0,0 +1,88 @@
+import logging
+import queue
+import threading
+import time
+
+from rda_python_globus.lib.logs import NonBlockingQueueHandler, queued_logging
+
+class _SlowHandler(logging.Handler):
+    def __init__(self, delay):
+        super().__init__()
+        self.delay = delay
+        self.messages = []
+
+    def emit(self, record):
+        time.sleep(self.delay)
+        self.messages.append(record.getMessage())
+
+def _record(msg):
+    return logging.LogRecord("test", logging.INFO, __file__, 0, msg, None, None)
+
+def test_slow_handler_does_not_block_logging():
+    logger = logging.getLogger("dsglobus-test-slow")
+    logger.propagate = False
+    slow = _SlowHandler(0.05)
+    listener = queued_logging([slow], logger=logger, level="info", queue_size=100, overflow="drop-new")
+
+    start = time.monotonic()
+    for i in range(20):
+        logger.info("message %d", i)
+    assert time.monotonic() - start < 0.5
+
+    listener.stop()
+    assert slow.messages == [f"message {i}" for i in range(20)]
+
+def test_drop_new_counts_dropped_records():
+    handler = NonBlockingQueueHandler(queue.Queue(maxsize=2), overflow="drop-new")
+    for i in range(5):
+        handler.handle(_record(f"m{i}"))
+    assert handler.dropped == 3
+    assert [handler.queue.get_nowait().getMessage() for _ in range(2)] == ["m0", "m1"]
+
+def test_drop_old_keeps_newest_records():
+    handler = NonBlockingQueueHandler(queue.Queue(maxsize=2), overflow="drop-old")
+    for i in range(5):
+        handler.handle(_record(f"m{i}"))
+    assert handler.dropped == 3
+    assert [handler.queue.get_nowait().getMessage() for _ in range(2)] == ["m3", "m4"]
+
+def test_stop_flushes_full_queue():
+    logger = logging.getLogger("dsglobus-test-flush")
+    logger.propagate = False
+    release = threading.Event()
+
+    class _GatedHandler(_SlowHandler):
+        def emit(self, record):
+            release.wait()
+            super().emit(record)
+
+    gated = _GatedHandler(0)
+    listener = queued_logging([gated], logger=logger, level="info", queue_size=3, overflow="block")
+    for i in range(4):
+        logger.info("message %d", i)
+    release.set()
+    listener.stop()
+    assert gated.messages == [f"message {i}" for i in range(4)]
+
+def test_invalid_environment_settings_fall_back_to_defaults(monkeypatch, capsys):
+    import pytest
+    from rda_python_globus.lib.config import LOG_QUEUE_SIZE
+
+    monkeypatch.setenv("DSGLOBUS_LOG_LEVEL", "chatty")
+    monkeypatch.setenv("DSGLOBUS_LOG_QUEUE_SIZE", "0")
+    monkeypatch.setenv("DSGLOBUS_LOG_OVERFLOW", "spill")
+    logger = logging.getLogger("dsglobus-test-invalid")
+    logger.propagate = False
+    listener = queued_logging([], logger=logger)
+    listener.stop()
+
+    warnings = capsys.readouterr().err.splitlines()
+    assert len(warnings) == 1
+    assert all(name in warnings[0] for name in ("DSGLOBUS_LOG_LEVEL", "DSGLOBUS_LOG_QUEUE_SIZE", "DSGLOBUS_LOG_OVERFLOW"))
+    assert listener.queue.maxsize == LOG_QUEUE_SIZE
+    assert logger.level == logging.INFO
+
+    with pytest.raises(ValueError):
+        queued_logging([], logger=logger, queue_size=0)
+    with pytest.raises(ValueError):
+        queued_logging([], logger=logger, level="chatty")
@@ -0,0 +1,77 @@
+import io
+
+import click
+import pytest
+
+from rda_python_globus.lib import manifest
+from rda_python_globus.lib.manifest import iter_manifest
+
+PAIR = ("source_file", "destination_file")
+
+def test_wrapped_json_array():
+    stream = io.StringIO("""
+    {
+        "files": [
+            {"source_file": "/data/a.tar", "destination_file": "/d/a.tar"},
+            {"source_file": "/data/it's.tar", "destination_file": "/d/it's.tar"},
+        ]
+    }
+    """)
+    entries = list(iter_manifest(stream, PAIR))
+    assert [e["source_file"] for e in entries] == ["/data/a.tar", "/data/it's.tar"]
+    assert entries[1]["destination_file"] == "/d/it's.tar"
+
+def test_top_level_array_of_strings():
+    stream = io.StringIO('["/d/file1.txt", "/d/dir1"]')
+    assert list(iter_manifest(stream, ("path",))) == [{"path": "/d/file1.txt"}, {"path": "/d/dir1"}]
+
+def test_ndjson():
+    stream = io.StringIO(
+        '{"old_path": "/a", "new_path": "/b"}\n'
+        '\n'
+        '{"old_path": "/c", "new_path": "/d"}\n'
+    )
+    entries = list(iter_manifest(stream, ("old_path", "new_path")))
+    assert entries == [{"old_path": "/a", "new_path": "/b"}, {"old_path": "/c", "new_path": "/d"}]
+
+def test_plain_text_with_optional_column():
+    stream = io.StringIO("# comment\n/data/a b.tar\t/d/a b.tar\t10\n/data/c.tar /d/c.tar\n")
+    entries = list(iter_manifest(stream, PAIR, optional=("size",)))
+    assert entries == [
+        {"source_file": "/data/a b.tar", "destination_file": "/d/a b.tar", "size": "10"},
+        {"source_file": "/data/c.tar", "destination_file": "/d/c.tar"},
+    ]
+
+def test_entries_split_across_chunks(monkeypatch):
+    monkeypatch.setattr(manifest, "CHUNK_SIZE", 7)
+    files = ",".join(
+        '{"source_file": "/data/%d", "destination_file": "/d/%d"}' % (i, i) for i in range(50)
+    )
+    entries = list(iter_manifest(io.StringIO('{"files": [%s]}' % files), PAIR))
+    assert [e["destination_file"] for e in entries] == ["/d/%d" % i for i in range(50)]
+
+def test_missing_column_is_an_error():
+    with pytest.raises(click.BadParameter):
+        list(iter_manifest(io.StringIO('[{"source_file": "/a"}]'), PAIR))
+
+def test_unterminated_array_is_an_error():
+    with pytest.raises(click.BadParameter):
+        list(iter_manifest(io.StringIO('["/a", "/b"'), ("path",)))
+
+def test_files_key_after_other_keys(monkeypatch):
+    monkeypatch.setattr(manifest, "CHUNK_SIZE", 5)
+    stream = io.StringIO(
+        '{"label": "x", "options": {"sync": [1, 2]},\n'
+        ' "files": [{"source_file": "/data/a", "destination_file": "/d/a"}], "extra": true}'
+    )
+    assert list(iter_manifest(stream, PAIR)) == [{"source_file": "/data/a", "destination_file": "/d/a"}]
+
+def test_trailing_comma_inside_entry():
+    stream = io.StringIO('{"files": [\n  {"source_file": "/data/a", "destination_file": "/d/a",},\n]}')
+    assert list(iter_manifest(stream, PAIR)) == [{"source_file": "/data/a", "destination_file": "/d/a"}]
+
+def test_byte_order_mark():
+    stream = io.StringIO('\ufeff{"files": [{"source_file": "/data/a", "destination_file": "/d/a"}]}')
+    assert list(iter_manifest(stream, PAIR)) == [{"source_file": "/data/a", "destination_file": "/d/a"}]
+    stream = io.StringIO('\ufeff/data/a\t/d/a\n')
+    assert list(iter_manifest(stream, PAIR)) == [{"source_file": "/data/a", "destination_file": "/d/a"}]
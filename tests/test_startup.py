@@ -0,0 +1,48 @@
+import subprocess
+import sys
+
+import click
+
+from rda_python_globus.main import LAZY_COMMANDS, cli
+
+# cumulative import time allowed for the package when running 'dsglobus --help',
+# in microseconds; generous enough for a loaded CI runner
+STARTUP_BUDGET_US = 300_000
+
+HELP = (
+    "import logging\n"
+    "from rda_python_globus.main import cli\n"
+    "assert not logging.getLogger().handlers\n"
+    "cli(['--help'])\n"
+)
+
+def _import_times(code):
+    """ Run code under -X importtime and return {module: cumulative microseconds}. """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0, result.stderr
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+def test_help_does_not_import_sdk_or_configure_logging():
+    times = _import_times(HELP)
+    assert "globus_sdk" not in times
+    assert "requests" not in times
+    assert "rda_python_globus.transfer" not in times
+    assert times["rda_python_globus"] < STARTUP_BUDGET_US
+
+def test_lazy_command_help_matches_commands():
+    ctx = click.Context(cli)
+    for name, (_, _, short_help) in LAZY_COMMANDS.items():
+        command = cli.get_command(ctx, name)
+        assert command.name == name
+        assert command.get_short_help_str(limit=1000) == short_help
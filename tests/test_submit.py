@@ -0,0 +1,64 @@
+import threading
+
+import pytest
+
+from rda_python_globus.lib.submit import ChunkSubmitter, submit_chunks
+from tests.fakes import api_error
+
+def _chunks(n):
+    for part in range(1, n + 1):
+        yield {"label": f"batch part {part}", "DATA": [{"source_path": f"/a/{part}"}]}
+
+def _submit(outcomes):
+    """ submit() that raises outcomes[label] if it is an exception. """
+    def submit(data):
+        outcome = outcomes.get(data["label"])
+        if isinstance(outcome, Exception):
+            raise outcome
+        return {"task_id": f"task-{data['label'][-1]}"}
+    return submit
+
+def test_chunk_submitter_records_every_part(capsys):
+    submitter = ChunkSubmitter(_submit({}), max_concurrent=3, queue_depth=1)
+    results = submitter.run(_chunks(5))
+    assert [(r[0], r[3], r[4]) for r in results] == [(n, f"task-{n}", None) for n in range(1, 6)]
+    assert "batch part 1: Task ID: task-1 (1 items)" in capsys.readouterr().out
+
+def test_chunk_submitter_survives_unexpected_errors():
+    failed = []
+    outcomes = {
+        "batch part 2": api_error(409, "Conflict"),
+        "batch part 3": RuntimeError("boom"),
+        "batch part 4": RuntimeError("boom"),
+    }
+
+    def on_failure(data):
+        failed.append(data["label"])
+        if data["label"] == "batch part 4":
+            raise OSError("disk full")
+
+    # a single worker and a small queue would deadlock if a failure killed the worker
+    submitter = ChunkSubmitter(_submit(outcomes), max_concurrent=1, queue_depth=1, on_failure=on_failure)
+    done = []
+    thread = threading.Thread(target=lambda: done.append(submitter.run(_chunks(6))), daemon=True)
+    thread.start()
+    thread.join(timeout=10)
+    assert done, "ChunkSubmitter.run() did not return"
+
+    results = done[0]
+    assert [r[3] for r in results] == ["task-1", None, None, None, "task-5", "task-6"]
+    assert isinstance(results[2][4], RuntimeError)
+    assert failed == ["batch part 2", "batch part 3", "batch part 4"]
+
+def test_submit_chunks_exit_status(capsys):
+    results = submit_chunks(_submit({}), _chunks(2), "batch", max_concurrent=2, queue_depth=2)
+    assert len(results) == 2
+    assert "Submitted 2 of 2 transfer tasks for 'batch'." in capsys.readouterr().out
+
+    with pytest.raises(SystemExit) as exc:
+        submit_chunks(_submit({"batch part 2": RuntimeError("boom")}), _chunks(3), "batch",
+                      max_concurrent=2, queue_depth=2, kind="delete")
+    assert exc.value.code == 1
+    out = capsys.readouterr().out
+    assert "Submitted 2 of 3 delete tasks for 'batch'." in out
+    assert "Failed parts: batch part 2" in out
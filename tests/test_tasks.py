@@ -0,0 +1,362 @@
+import itertools
+
+import pytest
+
+from rda_python_globus.lib.concurrency import prefetch
+from rda_python_globus.lib.tasks import iter_task_pages
+from tests.fakes import api_error
+
+class _Paginated:
+    def __init__(self, client):
+        self.client = client
+
+    def task_list(self, filter=None, orderby=None):
+        client = self.client
+
+        class _Pages:
+            def pages(self):
+                client.filters.append(filter)
+                tasks = client.matching(filter)[:1000]
+                for start in range(0, len(tasks), 400):
+                    yield tasks[start:start + 400]
+
+        return _Pages()
+
+class _TaskClient:
+    """ Fake client holding tasks newest first, with 3 tasks per request second. """
+
+    def __init__(self, ntasks):
+        self.tasks = [
+            {"task_id": f"t{i}", "request_time": "2024-01-01T00:%02d:%02d+00:00" % divmod(5999 - i // 3, 60)}
+            for i in range(ntasks)
+        ]
+        self.filters = []
+        self.paginated = _Paginated(self)
+
+    def matching(self, filter):
+        upper = None
+        for part in (filter or "").split("/"):
+            if part.startswith("request_time:"):
+                upper = part.split(",", 1)[1] or None
+        return [t for t in self.tasks if upper is None or t["request_time"][:19] <= upper]
+
+def test_iter_task_pages_beyond_the_offset_limit():
+    tc = _TaskClient(2500)
+    ids = [task["task_id"] for page in iter_task_pages(tc, "type:TRANSFER") for task in page]
+    assert ids == [f"t{i}" for i in range(2500)]
+    assert len(tc.filters) == 3
+
+def test_prefetch_yields_in_order_and_reraises():
+    def pages():
+        yield [1, 2]
+        yield [3]
+        raise RuntimeError("boom")
+
+    consumed = []
+    with pytest.raises(RuntimeError):
+        for page in prefetch(pages()):
+            consumed.extend(page)
+    assert consumed == [1, 2, 3]
+
+def test_prefetch_stops_producer_when_consumer_stops():
+    def numbers():
+        yield from itertools.count()
+
+    assert list(itertools.islice(prefetch(numbers()), 3)) == [0, 1, 2]
+
+def test_adaptive_poll_interval():
+    from rda_python_globus.lib.tasks import AdaptivePollInterval
+
+    poller = AdaptivePollInterval(min_interval=1, max_interval=100)
+    task = {"subtasks_total": 100, "subtasks_succeeded": 0}
+    assert poller.update(task, now=0) == 1
+    # no progress: back off
+    assert poller.update(task, now=10) == 1.5
+    # 50% done in 10 seconds: poll again after half of the remaining ~10 seconds
+    assert poller.update(dict(task, subtasks_succeeded=50), now=20) == 5
+    # slow progress is capped at max_interval
+    assert poller.update(dict(task, subtasks_succeeded=51), now=30) == 100
+
+def test_bulk_get_tasks_groups_ids_and_falls_back():
+    from rda_python_globus.lib.tasks import bulk_get_tasks
+
+    class _Client:
+        def __init__(self):
+            self.filters = []
+            self.gets = []
+
+        def task_list(self, limit=None, filter=None):
+            self.filters.append(filter)
+            ids = filter.split("/")[0][len("task_id:"):].split(",")
+            return [{"task_id": i} for i in ids if not i.startswith("other")]
+
+        def get_task(self, task_id):
+            self.gets.append(task_id)
+            if task_id == "other-missing":
+                raise api_error(404, "ClientError.NotFound")
+            if task_id == "other-namespace":
+                raise api_error(403, "PermissionDenied")
+            return {"task_id": task_id, "via": "get_task"}
+
+    tc = _Client()
+    ids = [f"t{i}" for i in range(120)] + ["other-found", "other-missing", "other-namespace"]
+    tasks = bulk_get_tasks(tc, ids)
+    assert list(tasks) == ids[:-2]
+    assert tasks["other-found"]["via"] == "get_task"
+    assert len(tc.filters) == 3
+    assert sorted(tc.gets) == ["other-found", "other-missing", "other-namespace"]
+
+def test_task_watch_flags_stalled_tasks_and_exits_when_done(monkeypatch):
+    from click.testing import CliRunner
+    from rda_python_globus import task_management
+
+    class _Client:
+        polls = 0
+
+        def task_list(self, limit=None, filter=None):
+            _Client.polls += 1
+            ids = filter.split("/")[0][len("task_id:"):].split(",")
+            status = "SUCCEEDED" if _Client.polls == 4 else "ACTIVE"
+            return [
+                {
+                    "task_id": i,
+                    "status": status,
+                    "subtasks_total": 4,
+                    "subtasks_succeeded": _Client.polls,
+                    "bytes_transferred": 0 if i.startswith("0") else _Client.polls * 1024,
+                    "effective_bytes_per_second": 1024,
+                }
+                for i in ids
+            ]
+
+    monkeypatch.setattr(task_management, "transfer_client", lambda namespace=None: _Client())
+    monkeypatch.setattr(task_management.time, "sleep", lambda seconds: None)
+    moving = "11111111-1111-1111-1111-111111111111"
+    stalled = "01111111-1111-1111-1111-111111111111"
+    result = CliRunner().invoke(task_management.task_watch, [moving, stalled, "--stall-after", "2"])
+    assert result.exit_code == 0
+    frames = result.output.strip().split("\n\n")
+    assert len(frames) == 4
+    assert "STALLED" in frames[2] and "STALLED" not in frames[3]
+    assert "0 of 2 tasks active" in frames[3]
+
+def test_task_successful_transfers_resumes_from_checkpoint(monkeypatch, tmp_path):
+    from click.testing import CliRunner
+    from globus_sdk import NetworkError
+    from rda_python_globus import task_management
+
+    pages = {
+        None: ([{"source_path": "/a", "destination_path": "/d/a"}], "m1"),
+        "m1": ([{"source_path": "/b", "destination_path": "/d/b"}], "m2"),
+        "m2": ([{"source_path": "/c", "destination_path": "/d/c"}], None),
+    }
+
+    class _Client:
+        fail_at = "m2"
+
+        def task_successful_transfers(self, task_id, marker=None):
+            if marker == _Client.fail_at:
+                raise NetworkError("connection reset", Exception())
+            data, next_marker = pages[marker]
+            return {"DATA": data, "next_marker": next_marker}
+
+    monkeypatch.setattr(task_management, "transfer_client", lambda namespace=None: _Client())
+    output = tmp_path / "files.csv"
+    checkpoint = tmp_path / "files.checkpoint"
+    args = ["11111111-1111-1111-1111-111111111111", "-o", str(output), "-F", "csv", "--checkpoint", str(checkpoint)]
+
+    result = CliRunner().invoke(task_management.task_successful_transfers, args)
+    assert result.exit_code == 1
+    assert checkpoint.exists()
+    # simulate a partially written page that was never checkpointed
+    with open(output, "a") as f:
+        f.write("/partial")
+
+    _Client.fail_at = None
+    result = CliRunner().invoke(task_management.task_successful_transfers, args)
+    assert result.exit_code == 0
+    assert not checkpoint.exists()
+    assert output.read_text() == "source_path,destination_path\n/a,/d/a\n/b,/d/b\n/c,/d/c\n"
+
+def test_task_list_merges_namespaces_newest_first(monkeypatch):
+    import json
+    import types
+    from click.testing import CliRunner
+    from rda_python_globus import task_management
+
+    def tasks(prefix, minutes):
+        return [
+            {
+                "task_id": f"{prefix}{m}",
+                "status": "SUCCEEDED",
+                "type": "TRANSFER",
+                "source_endpoint_display_name": "src",
+                "destination_endpoint_display_name": "dst",
+                "request_time": f"2024-01-01T00:{m:02d}:00+00:00",
+                "completion_time": None,
+                "label": None,
+            }
+            for m in minutes
+        ]
+
+    class _Client:
+        def __init__(self, tasks):
+            self.tasks = tasks
+            self.paginated = types.SimpleNamespace(
+                task_list=lambda filter=None, orderby=None: types.SimpleNamespace(pages=lambda: iter([self.tasks]))
+            )
+
+        def task_list(self, limit=None, filter=None, orderby=None):
+            return self.tasks[:limit]
+
+    clients = {
+        "DEFAULT": _Client(tasks("d", [50, 40, 30, 20, 10])),
+        "tacc": _Client(tasks("t", [45, 44, 35, 5])),
+    }
+    monkeypatch.setattr(task_management, "transfer_client", lambda namespace="DEFAULT": clients[namespace])
+
+    def task_list(*args):
+        result = CliRunner().invoke(task_management.task_list, ["-ns", "all", "-F", "ndjson", *args])
+        assert result.exit_code == 0, result.output
+        return [(r["namespace"], r["task_id"]) for r in map(json.loads, result.output.splitlines())]
+
+    # --max-results applies to the merged stream, not to each namespace
+    assert task_list("--max-results", "5") == [
+        ("DEFAULT", "d50"), ("tacc", "t45"), ("tacc", "t44"), ("DEFAULT", "d40"), ("tacc", "t35"),
+    ]
+    assert task_list("--limit", "3") == [("DEFAULT", "d50"), ("tacc", "t45"), ("tacc", "t44")]
+    assert len(task_list("--all")) == 9
+
+class _WaitClient:
+    """ Fake client whose tasks reach the given final status on the given poll. """
+
+    def __init__(self, finish):
+        self.finish = finish
+        self.polls = 0
+
+    def task_list(self, limit=None, filter=None):
+        self.polls += 1
+        ids = filter.split("/")[0][len("task_id:"):].split(",")
+        return [
+            {
+                "task_id": i,
+                "status": self.finish[i][0] if self.polls >= self.finish[i][1] else "ACTIVE",
+                "subtasks_total": 10,
+                "subtasks_succeeded": self.polls,
+            }
+            for i in ids
+            if i in self.finish
+        ]
+
+    def get_task(self, task_id):
+        raise api_error(403, "PermissionDenied")
+
+TASK_A = "11111111-1111-1111-1111-111111111111"
+TASK_B = "22222222-2222-2222-2222-222222222222"
+
+def _task_wait(monkeypatch, tc, args):
+    from click.testing import CliRunner
+    from rda_python_globus import task_management
+
+    clock = [0.0]
+
+    def sleep(seconds):
+        clock[0] += seconds
+
+    monkeypatch.setattr(task_management, "transfer_client", lambda namespace="DEFAULT": tc)
+    monkeypatch.setattr(task_management.time, "sleep", sleep)
+    monkeypatch.setattr(task_management.time, "monotonic", lambda: clock[0])
+    return CliRunner().invoke(task_management.task_wait, args)
+
+def test_task_wait_exit_status(monkeypatch):
+    tc = _WaitClient({TASK_A: ("SUCCEEDED", 2), TASK_B: ("SUCCEEDED", 3)})
+    result = _task_wait(monkeypatch, tc, [TASK_A, TASK_B])
+    assert result.exit_code == 0, result.output
+    assert tc.polls == 3
+
+    tc = _WaitClient({TASK_A: ("SUCCEEDED", 1), TASK_B: ("FAILED", 2)})
+    assert _task_wait(monkeypatch, tc, [TASK_A, TASK_B]).exit_code == 1
+
+    tc = _WaitClient({TASK_A: ("SUCCEEDED", 1), TASK_B: ("SUCCEEDED", 1000)})
+    result = _task_wait(monkeypatch, tc, [TASK_A, TASK_B, "--timeout", "60"])
+    assert result.exit_code == 124
+    assert f"Timed out waiting for 1 task(s): {TASK_B}" in result.output
+
+    # --any returns on the first finished task
+    tc = _WaitClient({TASK_A: ("SUCCEEDED", 1), TASK_B: ("SUCCEEDED", 1000)})
+    assert _task_wait(monkeypatch, tc, [TASK_A, TASK_B, "--any"]).exit_code == 0
+
+def test_task_wait_reports_tasks_of_other_namespaces_as_not_found(monkeypatch):
+    tc = _WaitClient({TASK_A: ("SUCCEEDED", 1)})
+    result = _task_wait(monkeypatch, tc, [TASK_A, TASK_B])
+    assert result.exit_code == 2
+    assert f"Task(s) not found: {TASK_B}" in result.output
+
+def test_task_watch_fails_fast_on_unknown_tasks(monkeypatch):
+    from click.testing import CliRunner
+    from rda_python_globus import task_management
+
+    class _Client(_WaitClient):
+        gets = 0
+
+        def get_task(self, task_id):
+            _Client.gets += 1
+            raise api_error(404, "ClientError.NotFound")
+
+    def interrupt(seconds):
+        raise KeyboardInterrupt
+
+    tc = _Client({TASK_A: ("ACTIVE", 1)})
+    monkeypatch.setattr(task_management, "transfer_client", lambda namespace="DEFAULT": tc)
+    monkeypatch.setattr(task_management.time, "sleep", interrupt)
+
+    result = CliRunner().invoke(task_management.task_watch, [TASK_A, TASK_B])
+    assert result.exit_code == 2
+    assert f"Task(s) not found: {TASK_B}" in result.output
+    assert (tc.polls, _Client.gets) == (1, 1)
+
+    # Ctrl+C stops watching with a non-zero status
+    result = CliRunner().invoke(task_management.task_watch, [TASK_A])
+    assert result.exit_code == 130
+
+class _EventClient:
+    """ Fake client holding nevents events, refusing offsets at or beyond max_offset. """
+
+    def __init__(self, nevents, max_offset=None):
+        self.events = [{"code": "PROGRESS", "n": n} for n in range(nevents)]
+        self.max_offset = max_offset
+        self.calls = []
+
+    def task_event_list(self, task_id, limit=None, offset=None, query_params=None):
+        self.calls.append((limit, offset))
+        if self.max_offset is not None and offset >= self.max_offset:
+            raise api_error(400, "ClientError.BadRequest", "offset too large")
+        return _EventPage(self.events[offset:offset + limit], len(self.events))
+
+class _EventPage(list):
+    def __init__(self, events, total):
+        super().__init__(events)
+        self.total = total
+
+    def get(self, key, default=None):
+        return self.total if key == "total" else default
+
+def test_iter_task_event_pages():
+    from rda_python_globus.lib.tasks import iter_task_event_pages
+
+    tc = _EventClient(2500)
+    pages = list(iter_task_event_pages(tc, "task"))
+    assert [(len(events), total) for events, total in pages] == [(1000, 2500), (1000, 2500), (500, 2500)]
+    assert [e["n"] for events, _ in pages for e in events] == list(range(2500))
+    assert tc.calls == [(1000, 0), (1000, 1000), (1000, 2000)]
+
+    tc = _EventClient(2500)
+    pages = list(iter_task_event_pages(tc, "task", max_results=1500))
+    assert sum(len(events) for events, _ in pages) == 1500
+    assert tc.calls == [(1000, 0), (500, 1000)]
+
+    # the service refuses offsets past its paging limit: keep what was read
+    tc = _EventClient(2500, max_offset=1000)
+    pages = list(iter_task_event_pages(tc, "task"))
+    assert [(len(events), total) for events, total in pages] == [(1000, 2500)]
+    assert tc.calls == [(1000, 0), (1000, 1000)]
@@ -0,0 +1,119 @@
+import io
+
+import click
+import pytest
+
+from rda_python_globus.lib import TACC_BASE_PATH, TACC_GLOBUS_ENDPOINT
+from rda_python_globus.transfer import _destination_path, _directory_index, chunk_batch_items, iter_batch_items, skip_existing_items
+from tests.fakes import Listing, api_error
+
+def _items(sizes):
+    return [(f"/data/{i}", f"/d/{i}", size, False) for i, size in enumerate(sizes)]
+
+def test_chunk_by_item_count():
+    chunks = list(chunk_batch_items(_items([None] * 5), max_items=2))
+    assert [len(c) for c in chunks] == [2, 2, 1]
+
+def test_chunk_by_bytes():
+    chunks = list(chunk_batch_items(_items([4, 4, 4, 20, 1]), max_bytes=10))
+    assert [[item[2] for item in c] for c in chunks] == [[4, 4], [4], [20], [1]]
+
+def test_chunk_by_bytes_requires_sizes():
+    with pytest.raises(click.BadParameter):
+        list(chunk_batch_items(_items([1, None]), max_bytes=10))
+
+def test_batch_items_prefix_tacc_destination_once():
+    batch = io.StringIO(f"/data/a\t/a\t5\n/data/b\t{TACC_BASE_PATH}/b\n")
+    items = list(iter_batch_items(batch, TACC_GLOBUS_ENDPOINT))
+    assert items == [
+        ("/data/a", f"{TACC_BASE_PATH}/a", 5, False),
+        ("/data/b", f"{TACC_BASE_PATH}/b", None, False),
+    ]
+
+def test_destination_path_prefixes_tacc_only():
+    assert _destination_path("/d/a", TACC_GLOBUS_ENDPOINT) == f"{TACC_BASE_PATH}/d/a"
+    assert _destination_path(f"{TACC_BASE_PATH}/d/a", TACC_GLOBUS_ENDPOINT) == f"{TACC_BASE_PATH}/d/a"
+    # a path that merely starts with the same characters is still prefixed
+    assert _destination_path(f"{TACC_BASE_PATH}x/a", TACC_GLOBUS_ENDPOINT) == f"{TACC_BASE_PATH}/{TACC_BASE_PATH.lstrip('/')}x/a"
+    assert _destination_path("/d/a", "some-other-endpoint") == "/d/a"
+
+def test_batch_items_recursive_override():
+    batch = io.StringIO('[{"source_file": "/data/x/", "destination_file": "/x/"},'
+                        ' {"source_file": "/data/y", "destination_file": "/y", "recursive": false}]')
+    items = list(iter_batch_items(batch, "dest", recursive=True))
+    assert [item[3] for item in items] == [True, False]
+
+class _ListingClient:
+    def __init__(self, listings):
+        self.listings = listings
+        self.calls = []
+
+    def operation_ls(self, endpoint, path=None, filter=None):
+        self.calls.append((endpoint, path, filter))
+        return Listing(path, self.listings.get((endpoint, path), []))
+
+def test_skip_existing_items_lists_each_directory_once():
+    tc = _ListingClient({
+        ("dst", "/d"): [
+            {"name": "a", "size": 5, "last_modified": "2024-01-02 00:00:00+00:00"},
+            {"name": "b", "size": 3, "last_modified": "2024-01-02 00:00:00+00:00"},
+        ],
+    })
+    batch = io.StringIO("/data/a\t/d/a\t5\n/data/b\t/d/b\t4\n/data/c\t/d/c\t1\n")
+    items = skip_existing_items(tc, iter_batch_items(batch, "dst"), "src", "dst")
+    assert [item[0] for item in items] == ["/data/b", "/data/c"]
+    assert tc.calls == [("dst", "/d", "type:file")]
+
+def test_directory_index_missing_and_unlistable_directories():
+    class _FailingClient:
+        def operation_ls(self, endpoint, path=None, filter=None):
+            raise api_error(404 if path == "/missing" else 403)
+
+    assert _directory_index(_FailingClient(), "dst", "/missing") == {}
+    assert _directory_index(_FailingClient(), "dst", "/private") is None
+
+def test_resubmit_from_submits_only_missing_files(monkeypatch):
+    import json
+    from click.testing import CliRunner
+    from rda_python_globus import transfer
+
+    class _Client:
+        def get_submission_id(self):
+            return {"value": "submission-id"}
+
+        def get_task(self, task_id):
+            return {
+                "type": "TRANSFER",
+                "status": "FAILED",
+                "label": "d999009 push",
+                "source_endpoint_id": "11111111-1111-1111-1111-111111111111",
+                "destination_endpoint_id": "22222222-2222-2222-2222-222222222222",
+            }
+
+        def task_successful_transfers(self, task_id, marker=None):
+            if marker is None:
+                return {"DATA": [{"source_path": "/data/a", "destination_path": "/d/a"}], "next_marker": "m1"}
+            return {"DATA": [{"source_path": "/data/c", "destination_path": "/d//c"}], "next_marker": None}
+
+    monkeypatch.setattr(transfer, "transfer_client", lambda namespace="DEFAULT": _Client())
+    result = CliRunner().invoke(
+        transfer.transfer_command,
+        ["--resubmit-from", "33333333-3333-3333-3333-333333333333", "--manifest", "-", "--dry-run"],
+        input="/data/a\t/d/a\n/data/b\t/d/b\n/data/c\t/d/c\n",
+    )
+    assert result.exit_code == 0, result.output
+    assert "Skipping 2 of 3 files" in result.output
+    assert "Label: d999009 push resubmit" in result.output
+    data = json.loads(result.output[result.output.index("["):])
+    assert [item["source_path"] for item in data] == ["/data/b"]
+
+def test_resubmit_from_requires_manifest():
+    from click.testing import CliRunner
+    from rda_python_globus import transfer
+
+    result = CliRunner().invoke(
+        transfer.transfer_command,
+        ["--resubmit-from", "33333333-3333-3333-3333-333333333333", "-sf", "/a", "-df", "/b"],
+    )
+    assert result.exit_code == 2
+    assert "--batch/--manifest" in result.output
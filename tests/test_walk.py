@@ -0,0 +1,25 @@
+import posixpath
+
+from rda_python_globus.lib.walk import walk_tree
+from tests.fakes import TreeClient
+
+TREE = {
+    "/": [("a.nc", "file", 1), ("sub", "dir", 0)],
+    "/sub/": [("b.nc", "file", 2), ("b.txt", "file", 3), ("deeper", "dir", 0)],
+    "/sub/deeper/": [("c.nc", "file", 4)],
+}
+
+def test_walk_visits_every_directory():
+    result = {d: [e["name"] for e in entries] for d, _, entries in walk_tree(TreeClient(TREE), "ep", workers=2)}
+    assert result == {"/": ["a.nc", "sub"], "/sub/": ["b.nc", "b.txt", "deeper"], "/sub/deeper/": ["c.nc"]}
+
+def test_walk_max_depth_and_filter_pushdown():
+    tc = TreeClient(TREE)
+    result = {d: [e["name"] for e in entries] for d, _, entries in walk_tree(tc, "ep", max_depth=1, filter="name:~*.nc")}
+    assert result == {"/": ["a.nc"], "/sub/": ["b.nc"]}
+    assert all(f in ("name:~*.nc", "type:dir") for _, f in tc.calls)
+    assert ("/sub/", "type:dir") not in tc.calls
+
+def test_walk_descend_prunes():
+    result = [d for d, _, _ in walk_tree(TreeClient(TREE), "ep", descend=lambda p, e, d: posixpath.basename(p.rstrip("/")) != "deeper")]
+    assert sorted(result) == ["/", "/sub/"]